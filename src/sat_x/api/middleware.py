@@ -0,0 +1,49 @@
+# src/sat_x/api/middleware.py
+import time
+
+from fastapi import Response
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware to log incoming requests and their processing time."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        if client is None:
+            logger.warning("Received request with no client information.")
+            await Response(status_code=400, content="Bad Request: No client info")(scope, receive, send)
+            return
+
+        idem = f"{client[0]}:{client[1]} - {scope['method']} {scope['path']}"
+        request_logger = logger.bind(idem=idem)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_logger.info("request start")
+        start_ns = time.perf_counter_ns()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            request_logger.exception("request failed")
+            # Re-raise the exception to let FastAPI handle it (e.g., return 500)
+            raise
+        finally:
+            process_time = (time.perf_counter_ns() - start_ns) / 1_000_000
+            # This part runs even if an exception occurred before response was formed
+            # Bound fields land in the JSON file sink without any format-string work
+            request_logger.bind(status=status_code, ms=process_time).info("request end")
@@ -1,17 +1,53 @@
 # src/sat_x/api/routes.py
 import datetime
-from typing import Optional
+import hashlib
+from collections.abc import AsyncIterator
+from typing import Any, Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import RuntimeSettings, get_settings
 from ..database import get_db_session
+from ..models import Metric
 from ..repositories import MetricRepository
+from ..services.latest_metric_cache import get_latest_cached
 from . import schemas  # Import the schemas we just defined
 
 # Create an API router
 router = APIRouter()
 
+def _row_to_dict(metric: Metric) -> dict[str, Any]:
+    """Builds the `MetricRead` payload straight from the ORM row, skipping Pydantic validation."""
+    return {
+        "id": metric.id,
+        "timestamp": metric.timestamp.isoformat(),
+        "cpu_percent": metric.cpu_percent,
+        "memory_percent": metric.memory_percent,
+        "disk_usage_percent": metric.disk_usage_percent,
+        "cpu_temp_celsius": metric.cpu_temp_celsius,
+        "fan_speed_percent": metric.fan_speed_percent,
+    }
+
+def _snap_to_bucket(ts: datetime.datetime, bucket: int) -> datetime.datetime:
+    """Floors `ts` to a multiple of `bucket` seconds so equivalent windows share a cache key."""
+    return ts - datetime.timedelta(seconds=ts.timestamp() % bucket)
+
+def _snap_window(
+    start_time: datetime.datetime, end_time: datetime.datetime, bucket: int
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """Widens the window outwards to whole buckets: start floored, end rounded up.
+
+    Rounding end up keeps a window that lies inside one bucket non-empty.
+    """
+    start = _snap_to_bucket(start_time, bucket)
+    end = _snap_to_bucket(end_time, bucket)
+    if end < end_time:
+        end += datetime.timedelta(seconds=bucket)
+    return start, end
+
 # --- Health Check Endpoint ---
 
 @router.get(
@@ -29,31 +65,34 @@ async def health_check():
 
 @router.get(
     "/metrics/latest",
-    response_model=Optional[schemas.MetricRead], # Can be None if no metrics yet
+    response_model=None,
+    # Rows are serialized by hand; the model is only declared for OpenAPI
+    responses={200: {"model": Optional[schemas.MetricRead]}}, # Can be None if no metrics yet
     summary="Get Latest Metric",
     description="Retrieves the most recently recorded system metric.",
     tags=["Metrics"]
 )
 async def get_latest_metric(
-    session: AsyncSession = Depends(get_db_session)
-) -> schemas.MetricRead | None:
+    session: AsyncSession = Depends(get_db_session),
+    settings: RuntimeSettings = Depends(get_settings)
+) -> ORJSONResponse:
     """
     Fetches the latest metric record from the database.
     Returns `null` if no metrics have been recorded yet.
+    The row only changes once per collection interval, so it is cached for half of it.
     """
-    repo = MetricRepository(session)
-    latest_metric = await repo.get_latest()
+    latest_metric = await get_latest_cached(session, ttl=settings.metrics_interval / 2)
     if not latest_metric:
         # Return None or raise 404, depending on desired behavior
         # Returning None allows frontend to handle 'no data yet' gracefully
-        return None
-    # Pydantic will automatically convert the ORM model to the schema
-    return latest_metric
+        return ORJSONResponse(None)
+    return ORJSONResponse(_row_to_dict(latest_metric))
 
 
 @router.get(
     "/metrics/range",
-    response_model=list[schemas.MetricRead],
+    response_model=None,
+    responses={200: {"model": list[schemas.MetricRead]}},
     summary="Get Metrics in Time Range",
     description="Retrieves system metrics recorded within a specific time window.",
     tags=["Metrics"]
@@ -62,18 +101,119 @@ async def get_metrics_in_range(
     start_time: datetime.datetime = Query(..., description="Start timestamp (ISO 8601 format)"),
     end_time: datetime.datetime = Query(..., description="End timestamp (ISO 8601 format)"),
     limit: int = Query(100, gt=0, le=1000, description="Maximum number of metrics to return"),
-    session: AsyncSession = Depends(get_db_session)
-) -> list[schemas.MetricRead]:
+    session: AsyncSession = Depends(get_db_session),
+    settings: RuntimeSettings = Depends(get_settings)
+) -> ORJSONResponse:
     """
     Fetches metrics recorded between `start_time` and `end_time`.
     Results are ordered by timestamp ascending.
+    Both bounds are snapped outwards to the metrics collection interval so the response is cacheable.
     """
     if start_time >= end_time:
         raise HTTPException(status_code=400, detail="Start time must be before end time.")
 
+    bucket = settings.metrics_interval
+    start, end = _snap_window(start_time, end_time, bucket)
+
     repo = MetricRepository(session)
-    metrics = await repo.get_range(start_time=start_time, end_time=end_time, limit=limit)
-    # Pydantic automatically converts the list of ORM models
-    return metrics
+    metrics = await repo.get_range(start_time=start, end_time=end, limit=limit)
+
+    etag_source = repr((start.isoformat(), end.isoformat(), limit, len(metrics), metrics[-1].id if metrics else 0))
+    headers = {
+        "Cache-Control": f"public, max-age={bucket}",
+        "ETag": f'"{hashlib.sha1(etag_source.encode()).hexdigest()}"',
+    }
+    return ORJSONResponse([_row_to_dict(m) for m in metrics], headers=headers)
+
+
+@router.get(
+    "/metrics/range.ndjson",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One MetricRead JSON object per line."}},
+    summary="Stream Metrics in Time Range",
+    description="Streams system metrics recorded within a specific time window as newline-delimited JSON.",
+    tags=["Metrics"]
+)
+async def stream_metrics_in_range(
+    start_time: datetime.datetime = Query(..., description="Start timestamp (ISO 8601 format)"),
+    end_time: datetime.datetime = Query(..., description="End timestamp (ISO 8601 format)"),
+    limit: int = Query(100, gt=0, le=1000, description="Maximum number of metrics to return"),
+    session: AsyncSession = Depends(get_db_session),
+    settings: RuntimeSettings = Depends(get_settings)
+) -> StreamingResponse:
+    """
+    Same window as `/metrics/range`, but rows are written as they are read from the database,
+    so memory stays constant and the first row is sent without waiting for the rest.
+    """
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time.")
+
+    bucket = settings.metrics_interval
+    start, end = _snap_window(start_time, end_time, bucket)
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            async for metric in MetricRepository(session).stream_range(start_time=start, end_time=end, limit=limit):
+                yield orjson.dumps(_row_to_dict(metric)) + b"\n"
+        finally:
+            # The request's session dependency may already have exited; release the connection we used
+            await session.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def _columns_to_arrow_ipc(columns: dict[str, list[Any]]) -> bytes:
+    """Encodes metric columns as an Arrow IPC stream (requires the optional `pyarrow` extra)."""
+    import pyarrow as pa  # Optional and heavy; only loaded when this endpoint is used
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("cpu_percent", pa.float64()),
+        ("memory_percent", pa.float64()),
+        ("disk_usage_percent", pa.float64()),
+        ("cpu_temp_celsius", pa.float64()),
+        ("fan_speed_percent", pa.float64()),
+    ])
+    table = pa.Table.from_pydict(columns, schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+@router.get(
+    "/metrics/range.arrow",
+    response_class=Response,
+    responses={
+        200: {"content": {ARROW_STREAM_MEDIA_TYPE: {}}, "description": "MetricRead columns as an Arrow IPC stream."},
+        501: {"description": "The server was installed without the `arrow` extra (pyarrow)."},
+    },
+    summary="Get Metrics in Time Range as Arrow",
+    description="Retrieves system metrics recorded within a specific time window in Apache Arrow IPC stream format.",
+    tags=["Metrics"]
+)
+async def get_metrics_in_range_arrow(
+    start_time: datetime.datetime = Query(..., description="Start timestamp (ISO 8601 format)"),
+    end_time: datetime.datetime = Query(..., description="End timestamp (ISO 8601 format)"),
+    limit: int = Query(100, gt=0, le=1000, description="Maximum number of metrics to return"),
+    session: AsyncSession = Depends(get_db_session),
+    settings: RuntimeSettings = Depends(get_settings)
+) -> Response:
+    """
+    Same window as `/metrics/range`, but columnar: no ORM objects and no per-row JSON encoding.
+    """
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="Start time must be before end time.")
+
+    bucket = settings.metrics_interval
+    start, end = _snap_window(start_time, end_time, bucket)
+
+    columns = await MetricRepository(session).get_range_columns(start_time=start, end_time=end, limit=limit)
+    try:
+        body = _columns_to_arrow_ipc(columns)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow (install sat-x[arrow]).") from None
+    return Response(content=body, media_type=ARROW_STREAM_MEDIA_TYPE, headers={"Cache-Control": f"public, max-age={bucket}"})
 
 # Add more endpoints as needed, e.g., get metric by ID, list all (paginated)
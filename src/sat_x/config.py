@@ -1,11 +1,26 @@
+import math
+import os
+import pickle
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 
 import yaml
 from pydantic import BaseModel, Field, validator
 
+try:
+    # libyaml-backed loader is ~10x faster; PyYAML silently lacks it if built without libyaml
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader  # type: ignore[assignment]
+
 # Base directory of the project
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DEFAULT_CONFIG_PATH = BASE_DIR / "config" / "settings.yaml"
+# Sidecar pickle of the validated settings, stored next to the YAML file
+CACHE_SUFFIX = ".yaml.cache"
 
 class ApiSettings(BaseModel):
     host: str = "127.0.0.1"
@@ -16,10 +31,24 @@ class ApiSettings(BaseModel):
 class DatabaseSettings(BaseModel):
     url: str
     echo: bool = False
+    # Connection pool for server databases (postgresql+asyncpg); SQLite ignores these
+    pool_size: int = Field(5, gt=0, description="Connections kept open in the pool.")
+    max_overflow: int = Field(5, ge=0, description="Extra connections allowed above pool_size under load.")
+    pool_timeout: float = Field(30, gt=0, description="Seconds to wait for a free connection.")
 
 class MetricsTaskSettings(BaseModel):
     enabled: bool = True
     interval_seconds: int = Field(60, gt=0) # Ensure interval is positive
+    # Samples are buffered and written in one INSERT when either limit is reached
+    batch_size: int = Field(10, gt=0, description="Flush after this many buffered samples.")
+    flush_interval_seconds: int = Field(60, gt=0, description="Flush at least this often (seconds).")
+
+class PartitionTaskSettings(BaseModel):
+    """Daily partition maintenance for the metrics table (PostgreSQL only)."""
+    enabled: bool = True
+    interval_seconds: int = Field(3600, gt=0, description="How often to create/drop partitions.")
+    premake_days: int = Field(3, ge=0, description="Create partitions this many days ahead.")
+    retention_days: int = Field(30, gt=0, description="Drop partitions older than this many days.")
 
 # --- Fan Control Settings ---
 class FanCurvePoint(BaseModel):
@@ -43,13 +72,32 @@ class FanControlSettings(BaseModel):
         if not v:
             # Allow empty curve if disabled, maybe log warning if enabled?
             return v
-        temps = [p.temp for p in v]
-        if temps != sorted(temps):
-            raise ValueError('Fan curve points must be sorted by temperature.')
+        # Single pass, no temporary lists or sort
+        prev = -math.inf
+        for p in v:
+            if p.temp < prev:
+                raise ValueError('Fan curve points must be sorted by temperature.')
+            prev = p.temp
         return v
 
+    @cached_property
+    def curve_temps(self) -> array:
+        """Curve temperatures as a flat array, searched with bisect."""
+        return array("d", (p.temp for p in self.curve))
+
+    @cached_property
+    def curve_speeds(self) -> array:
+        """Curve speeds (%), parallel to `curve_temps`."""
+        return array("d", (p.speed for p in self.curve))
+
+    def speed_for(self, temp: float) -> float:
+        """Speed (%) of the last curve point at or below `temp` °C, or 0 below the curve."""
+        idx = bisect_right(self.curve_temps, temp) - 1
+        return self.curve_speeds[idx] if idx >= 0 else 0.0
+
 class TasksSettings(BaseModel):
     metrics: MetricsTaskSettings
+    partitions: PartitionTaskSettings = Field(default_factory=PartitionTaskSettings)
     # Add other task configurations here
     # other_task: OtherTaskSettings
 
@@ -63,14 +111,20 @@ class Settings(BaseModel):
 
     @classmethod
     def load_from_yaml(cls, path: Path = DEFAULT_CONFIG_PATH) -> "Settings":
-        """Loads configuration from a YAML file."""
+        """Loads configuration from a YAML file, reusing a cached copy if the file is unchanged."""
         if not path.exists():
             raise FileNotFoundError(f"Configuration file not found at {path}")
 
+        cache_path = path.with_suffix(CACHE_SUFFIX)
+        cache_key = cls._cache_key(path)
+        cached = cls._read_cache(cache_path, cache_key)
+        if cached is not None:
+            return cached
+
         try:
             with open(path) as f:
-                yaml_data = yaml.safe_load(f)
-            return cls.model_validate(yaml_data)
+                yaml_data = yaml.load(f, Loader=_Loader)  # Only runs on a cache miss
+            loaded = cls.model_validate(yaml_data)
         except yaml.YAMLError as e:
             print(f"Error parsing YAML file {path}: {e}")
             raise
@@ -78,6 +132,69 @@ class Settings(BaseModel):
             print(f"Error loading configuration from {path}: {e}")
             raise
 
+        cls._write_cache(cache_path, cache_key, loaded)
+        return loaded
+
+    @staticmethod
+    def _cache_key(path: Path) -> tuple[str, int, int, int]:
+        """Identifies a YAML file revision (and the schema in this module that validated it)."""
+        st = path.stat()
+        # Include this module's mtime so a schema change never reuses an old pickle
+        return (str(path.resolve()), st.st_mtime_ns, st.st_size, Path(__file__).stat().st_mtime_ns)
+
+    @classmethod
+    def _read_cache(cls, cache_path: Path, cache_key: tuple[str, int, int, int]) -> "Settings | None":
+        """Returns the cached settings if the cache matches `cache_key`, otherwise None."""
+        try:
+            with open(cache_path, "rb") as f:
+                stored_key, stored_settings = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # A corrupt or incompatible cache just means taking the slow path
+            print(f"Ignoring unreadable settings cache {cache_path}: {e}")
+            return None
+        if stored_key != cache_key or not isinstance(stored_settings, cls):
+            return None
+        return stored_settings
+
+    @staticmethod
+    def _write_cache(cache_path: Path, cache_key: tuple[str, int, int, int], loaded: "Settings") -> None:
+        """Atomically writes the validated settings next to the YAML file (best effort)."""
+        if not os.access(cache_path.parent, os.W_OK):
+            # e.g. read-only config directory under the systemd unit; caching is an optimisation only
+            return
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((cache_key, loaded), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Could not write settings cache {cache_path}: {e}")
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+@dataclass(frozen=True, slots=True)
+class RuntimeSettings:
+    """Flat, immutable view of the settings read on hot paths (plain slot loads, hashable)."""
+    db_url: str
+    api_host: str
+    api_port: int
+    metrics_enabled: bool
+    metrics_interval: int
+
+    @classmethod
+    def from_settings(cls, s: Settings) -> "RuntimeSettings":
+        return cls(
+            db_url=s.database.url,
+            api_host=s.api.host,
+            api_port=s.api.port,
+            metrics_enabled=s.tasks.metrics.enabled,
+            metrics_interval=s.tasks.metrics.interval_seconds,
+        )
+
 # Load settings globally on import
 # Consider dependency injection for more complex scenarios
 try:
@@ -98,6 +215,9 @@ except Exception as e:
     print(f"Unexpected error loading settings: {e}")
     raise SystemExit(1)
 
-def get_settings() -> Settings:
+# Built once at import; the full Pydantic `settings` stays available for lifespan/CLI code
+runtime_settings = RuntimeSettings.from_settings(settings)
+
+def get_settings() -> RuntimeSettings:
     """Dependency function to get settings (useful for FastAPI)."""
-    return settings
+    return runtime_settings
@@ -1,19 +1,44 @@
+import asyncio
+import datetime
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
 
-from .config import settings
+from .config import DatabaseSettings, settings
+
+
+def _engine_options(db_settings: DatabaseSettings) -> dict[str, Any]:
+    """Returns pool/connect options suited to the configured database dialect."""
+    db_url = make_url(db_settings.url)
+    if db_url.get_backend_name() == "sqlite":
+        # SQLite can't usefully share a connection across asyncio tasks, so open one per use.
+        # An in-memory database only lives as long as its connection, so keep a single one.
+        in_memory = db_url.database in (None, "", ":memory:")
+        return {
+            "poolclass": StaticPool if in_memory else NullPool,
+            # connect_args are important for SQLite with asyncio/multithreading
+            # to prevent "SQLite objects created in a thread can only be used in that same thread"
+            # The check_same_thread=False is specific to sqlite3 driver used by aiosqlite
+            "connect_args": {"check_same_thread": False},
+        }
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": db_settings.pool_size,
+        "max_overflow": db_settings.max_overflow,
+        "pool_timeout": db_settings.pool_timeout,
+        "pool_pre_ping": True,  # Good practice for reliability
+    }
 
 # Create the async engine
 engine = create_async_engine(
     settings.database.url,  # Use the string URL directly
     echo=settings.database.echo,
-    pool_pre_ping=True,  # Good practice for reliability
-    # connect_args are important for SQLite with asyncio/multithreading
-    # to prevent "SQLite objects created in a thread can only be used in that same thread"
-    # The check_same_thread=False is specific to sqlite3 driver used by aiosqlite
-    connect_args={"check_same_thread": False}
+    **_engine_options(settings.database),
 )
 
 # Create a configured "Session" class
@@ -47,5 +72,25 @@ async def init_db(engine_instance):
         # and then import models here.
         # from . import models # Assuming models are defined in models.py or models/
         # await conn.run_sync(Base.metadata.drop_all) # Use with caution!
+        if conn.dialect.name == "postgresql":
+            # Day-partitioned metrics table; create_all then leaves it alone
+            from .services import partition_service
+            if await partition_service.create_partitioned_metrics(conn):
+                await partition_service.ensure_partitions(
+                    conn, datetime.datetime.now(datetime.UTC).date(), settings.tasks.partitions.premake_days
+                )
         await conn.run_sync(Base.metadata.create_all)
     await engine_instance.dispose() # Dispose of the engine after init
+
+async def warm_pool(engine_instance: AsyncEngine, n: int | None = None):
+    """Opens `n` (default: the pool size) connections concurrently so early requests don't pay connect latency."""
+    if not isinstance(engine_instance.pool, AsyncAdaptedQueuePool):
+        return  # Nothing to warm for NullPool/StaticPool (SQLite)
+    if n is None:
+        n = engine_instance.pool.size()
+
+    async def _ping():
+        async with engine_instance.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(n)))
@@ -1,4 +1,5 @@
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -7,6 +8,16 @@ from loguru import logger
 # Default log level (can be overridden by config later if needed)
 LOG_LEVEL = "INFO"
 LOG_FILE = Path("logs/sat-x.log") # Example file path
+# Variable diagnostics on tracebacks are expensive, so only enable them in development
+DEV_MODE = os.environ.get("SATX_DEV") == "1"
+
+# Standard library loggers routed into loguru, with the minimum level forwarded
+INTERCEPTED_LOGGERS = {
+    "uvicorn.access": logging.INFO,
+    "uvicorn.error": logging.INFO,
+    "sqlalchemy.engine": logging.WARNING,  # INFO here would switch on per-statement SQL logging
+    "asyncio": logging.WARNING,  # e.g. "Task exception was never retrieved"
+}
 
 # Intercept standard logging
 class InterceptHandler(logging.Handler):
@@ -29,6 +40,25 @@ class InterceptHandler(logging.Handler):
         )
 
 
+_CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+def _console_format(record) -> str:
+    """Console format, appending request fields bound by the access log middleware."""
+    fmt = _CONSOLE_FORMAT
+    extra = record["extra"]
+    if "idem" in extra:
+        fmt += " | {extra[idem]}"
+    if "status" in extra:
+        fmt += " -> {extra[status]}"
+    if "ms" in extra:
+        fmt += " in {extra[ms]:.2f}ms"
+    return fmt + "\n{exception}"
+
+
 def setup_logging():
     """Configures Loguru logger."""
     # Remove default handlers
@@ -38,12 +68,11 @@ def setup_logging():
     logger.add(
         sys.stderr,
         level=LOG_LEVEL.upper(),
-        format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-               "<level>{level: <8}</level> | "
-               "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+        format=_console_format,
         colorize=True,
         backtrace=True,
-        diagnose=True # Set diagnose=False in production for performance
+        diagnose=DEV_MODE, # Set SATX_DEV=1 to show variable values in tracebacks
+        enqueue=False # loguru default, kept explicit: only the file sink below uses a queue
     )
 
     # Optional: Add file sink for structured JSON logging
@@ -61,13 +90,15 @@ def setup_logging():
         diagnose=False # Keep diagnose False for file logs usually
     )
 
-    # Intercept standard logging messages
-    logging.basicConfig(handlers=[InterceptHandler()], level=0)
-    # Configure specific loggers if needed (e.g., uvicorn)
-    logging.getLogger("uvicorn.access").handlers = [InterceptHandler()]
-    logging.getLogger("uvicorn.error").handlers = [InterceptHandler()]
-    # Propagate false to prevent uvicorn default handler
-    logging.getLogger("uvicorn.error").propagate = False
+    # Intercept only the stdlib loggers we care about; a root-level handler at level 0 would
+    # frame-walk every DEBUG record from chatty libraries just for loguru to drop it
+    logging.getLogger().handlers = [logging.NullHandler()]
+    for name, level in INTERCEPTED_LOGGERS.items():
+        std_logger = logging.getLogger(name)
+        std_logger.handlers = [InterceptHandler()]
+        std_logger.setLevel(level)
+        # Propagate false to prevent uvicorn default handler / double logging
+        std_logger.propagate = False
 
     logger.info("Loguru logging configured.")
     logger.info(f"Console log level: {LOG_LEVEL}")
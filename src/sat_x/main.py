@@ -1,11 +1,12 @@
 import asyncio
-import time
+import sys
 from contextlib import asynccontextmanager
 
+import orjson
 import typer
-import uvicorn
 from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.routing import Route
 
 from .logging_config import logger, setup_logging
 
@@ -13,19 +14,38 @@ setup_logging()
 
 # --- App Initialization ---
 from .api import routes as api_routes
+from .api.middleware import AccessLogMiddleware
 from .config import Settings, get_settings
-from .database import engine, init_db
-from .tasks.fan_control_task import run_fan_control_task
-from .tasks.metrics_collector import run_metrics_collector_task
+from .config import settings as full_settings
+from .database import engine, init_db, warm_pool
 
 # List to keep track of background tasks
 background_tasks = set()
 
 
+def install_cached_openapi(app: FastAPI) -> None:
+    """Serves the OpenAPI schema from bytes encoded once, instead of re-encoding it per request."""
+    if app.openapi_url is None or getattr(app.state, "openapi_cached", False):
+        return
+    schema_bytes = orjson.dumps(app.openapi())  # app.openapi() also caches the dict for /docs
+
+    async def openapi_json(request: Request) -> Response:
+        return Response(content=schema_bytes, media_type="application/json")
+
+    # Ahead of FastAPI's own route for the same path, which would json.dumps the dict every time
+    app.router.routes.insert(0, Route(app.openapi_url, openapi_json, include_in_schema=False))
+    app.state.openapi_cached = True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Get settings *within* the lifespan context to respect overrides
-    settings: Settings = get_settings()  # Use a direct call
+    # Imported here so CLI commands don't pay for psutil and the task modules
+    from .tasks.fan_control_task import run_fan_control_task
+    from .tasks.metrics_collector import run_metrics_collector_task
+    from .tasks.partition_task import run_partition_task
+
+    # Background tasks need the full Pydantic settings (e.g. the fan curve)
+    settings: Settings = full_settings
 
     logger.info(f"Application starting with version: {app.version}")
     logger.info(f"Using database: {settings.database.url}")
@@ -33,6 +53,7 @@ async def lifespan(app: FastAPI):
     # Initialize Database
     logger.info("Initializing database...")
     await init_db(engine)
+    await warm_pool(engine)
     logger.info("Database initialized.")
 
     # --- Start Background Tasks ---
@@ -49,6 +70,13 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Metrics collector task is disabled in settings.")
 
+    # Start Partition Maintenance Task (returns immediately unless on PostgreSQL)
+    if settings.tasks.partitions.enabled:
+        partition_task = asyncio.create_task(run_partition_task(settings))
+        background_tasks.add(partition_task)
+        logger.info("Partition maintenance task scheduled.")
+        partition_task.add_done_callback(background_tasks.discard)
+
     # Start Fan Control Task
     if settings.fan_control and settings.fan_control.enabled:
         fan_task = asyncio.create_task(run_fan_control_task(settings))
@@ -59,38 +87,33 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Fan control task is disabled in settings.")
 
+    # All routes are registered by now, so the schema can be frozen
+    install_cached_openapi(app)
+
     yield  # Application runs here
 
     # --- Shutdown ---
     logger.info("Application shutdown initiated...")
-    logger.info(f"Cancelling {len(background_tasks)} background tasks...")
-    for task in list(background_tasks):  # Iterate over a copy
-        if not task.done():
-            task.cancel()
-            try:
-                # Wait for the task to acknowledge cancellation
-                await asyncio.wait_for(task, timeout=5.0)
-            except asyncio.CancelledError:
+    tasks = list(background_tasks)  # Done callbacks shrink the set as tasks finish
+    logger.info(f"Cancelling {len(tasks)} background tasks...")
+    for task in tasks:
+        task.cancel()  # No-op for tasks that already finished
+
+    if tasks:
+        # One shared timeout: shutdown takes as long as the slowest task, not the sum
+        done, pending = await asyncio.wait(tasks, timeout=5.0)
+        for task in pending:
+            logger.warning(f"Task {task.get_name()} did not cancel within timeout.")
+
+        finished = list(done)
+        results = await asyncio.gather(*finished, return_exceptions=True)
+        for task, result in zip(finished, results):
+            if isinstance(result, asyncio.CancelledError):
                 logger.info(f"Task {task.get_name()} cancelled successfully.")
-            except TimeoutError:
-                logger.warning(f"Task {task.get_name()} did not cancel within timeout.")
-            except Exception as e:
-                logger.error(
-                    f"Error during cancellation of task {task.get_name()}: {e}"
-                )
-        else:
-            # Log if task already finished (e.g., due to an error)
-            exception = task.exception()
-            if exception:
-                logger.warning(
-                    f"Background task {task.get_name()} finished with exception: {exception}"
-                )
+            elif isinstance(result, BaseException):
+                logger.warning(f"Background task {task.get_name()} finished with exception: {result}")
             else:
                 logger.info(f"Background task {task.get_name()} already finished.")
-
-    # Explicitly wait for all tasks to ensure they are cleaned up
-    if background_tasks:  # Check if set is not empty after callbacks
-        await asyncio.gather(*background_tasks, return_exceptions=True)
         logger.info("All background tasks awaited.")
 
     await engine.dispose()  # Correctly dispose of the engine's connections
@@ -105,41 +128,15 @@ app_instance = FastAPI(
     version="0.0.0",
     lifespan=lifespan,  # Use the lifespan context manager
     openapi_url="/api/v1/openapi.json",  # Default OpenAPI spec location
+    default_response_class=ORJSONResponse,  # orjson encodes datetimes/floats natively
 )
 
 
-# --- Request Logging Middleware ---
-async def log_requests(request: Request, call_next):
-    """Middleware to log incoming requests and their processing time."""
-    if request is None or request.client is None:
-        logger.warning("Received request with no client information.")
-        return Response(status_code=400, content="Bad Request: No client info")
-    idem = (
-        f"{request.client.host}:{request.client.port} - "
-        f"{request.method} {request.url.path}"
-    )
-    logger.info(f"===> Request started: {idem}")
-    start_time = time.time()
-
-    try:
-        response: Response = await call_next(request)
-    except Exception as e:
-        logger.exception(f"!!! Request failed: {idem}")
-        # Re-raise the exception to let FastAPI handle it (e.g., return 500)
-        raise e
-    finally:
-        process_time = (time.time() - start_time) * 1000
-        # This part runs even if an exception occurred before response was formed
-        formatted_process_time = f"{process_time:.2f}ms"
-        logger.info(f"<=== Request finished: {idem} in {formatted_process_time}")
-
-    return response
-
-
 # Add the logging middleware
-app_instance.add_middleware(BaseHTTPMiddleware, dispatch=log_requests)
+app_instance.add_middleware(AccessLogMiddleware)
 
 # --- Middleware --- (Example: CORS)
+# from fastapi.middleware.cors import CORSMiddleware  # Import here, only when enabled
 # if settings.api.cors_origins:
 #     app_instance.add_middleware(
 #         CORSMiddleware,
@@ -172,11 +169,13 @@ def run_server(
     reload: bool = typer.Option(default=False, help="Enable auto-reload."),
 ):
     """Runs the sat-x FastAPI web server."""
+    import uvicorn  # Only the server command needs it
+
     # Get settings to use for default host/port if not provided
     # This call should happen at runtime, not module load time
     runtime_settings = get_settings()
-    final_host = host if host is not None else runtime_settings.api.host
-    final_port = port if port is not None else runtime_settings.api.port
+    final_host = host if host is not None else runtime_settings.api_host
+    final_port = port if port is not None else runtime_settings.api_port
 
     logger.info(
         f"Starting server on {final_host}:{final_port} {'with reload' if reload else ''}"
@@ -187,6 +186,10 @@ def run_server(
         port=final_port,
         reload=reload,
         log_config=None,  # Use our configured loguru logger
+        # uvloop/httptools are much faster than the stdlib loop and h11; uvloop has no Windows build
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        # Single worker on purpose: background tasks and in-process caches assume one process
     )
 
 
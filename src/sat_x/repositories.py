@@ -1,8 +1,9 @@
 import datetime
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from collections.abc import AsyncIterator
+from typing import Any, Generic, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .database import Base
@@ -10,6 +11,11 @@ from .models import Metric
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Column order of exported metric rows (matches schemas.MetricRead)
+METRIC_COLUMNS = ("id", "timestamp", "cpu_percent", "memory_percent", "disk_usage_percent", "cpu_temp_celsius", "fan_speed_percent")
+# Columns set on insert; id is generated and an unset timestamp falls back to the server default
+_METRIC_INSERT_COLUMNS = tuple(c.key for c in Metric.__table__.columns if not c.primary_key)
+
 # --- Generic Base Repository --- (Optional but good practice)
 class BaseRepository(Generic[ModelType], ABC):
     def __init__(self, session: AsyncSession, model: type[ModelType]):
@@ -35,15 +41,21 @@ class MetricRepository:
         self._session = session
 
     async def add(self, metric: Metric) -> Metric:
-        """Adds a new metric record to the database."""
-        self._session.add(metric)
-        await self._session.flush() # Assigns ID without full commit
-        await self._session.refresh(metric)
+        """Inserts `metric` in one round trip and fills in its generated id and timestamp.
+
+        Uses a Core INSERT ... RETURNING, so `metric` is not added to the session
+        (no identity map entry, flush or refresh); the caller still commits.
+        """
+        values = {key: value for key in _METRIC_INSERT_COLUMNS if (value := getattr(metric, key)) is not None}
+        stmt = insert(Metric).values(**values).returning(Metric.id, Metric.timestamp)
+        metric.id, metric.timestamp = (await self._session.execute(stmt)).one()
         return metric
 
     async def get_latest(self) -> Metric | None:
         """Retrieves the most recent metric record."""
-        stmt = select(Metric).order_by(Metric.timestamp.desc()).limit(1)
+        # Rows are appended in time order, so the primary key index finds the newest one
+        # (the BRIN timestamp index on PostgreSQL cannot serve ORDER BY ... LIMIT).
+        stmt = select(Metric).order_by(Metric.id.desc()).limit(1)
         result = await self._session.execute(stmt)
         return result.scalars().first()
 
@@ -63,8 +75,43 @@ class MetricRepository:
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
 
+    async def stream_range(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int = 100
+    ) -> AsyncIterator[Metric]:
+        """Yields metrics within a time range one row at a time, without building a list."""
+        stmt = (
+            select(Metric)
+            .where(Metric.timestamp >= start_time, Metric.timestamp <= end_time)
+            .order_by(Metric.timestamp.asc())
+            .limit(limit)
+        )
+        result = await self._session.stream_scalars(stmt)
+        async for metric in result:
+            yield metric
+
+    async def get_range_columns(
+        self,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        limit: int = 100
+    ) -> dict[str, list[Any]]:
+        """Same rows as `get_range`, as one list per column without building ORM objects."""
+        columns = [Metric.__table__.c[name] for name in METRIC_COLUMNS]
+        stmt = (
+            select(*columns)
+            .where(Metric.timestamp >= start_time, Metric.timestamp <= end_time)
+            .order_by(Metric.timestamp.asc())
+            .limit(limit)
+        )
+        rows = (await self._session.execute(stmt)).all()
+        values = list(zip(*rows)) if rows else [()] * len(METRIC_COLUMNS)
+        return {name: list(column) for name, column in zip(METRIC_COLUMNS, values)}
+
     async def list_all(self, limit: int = 100) -> list[Metric]:
         """Lists all metrics, limited by `limit`."""
-        stmt = select(Metric).order_by(Metric.timestamp.desc()).limit(limit)
+        stmt = select(Metric).order_by(Metric.id.desc()).limit(limit) # Newest first, see get_latest
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
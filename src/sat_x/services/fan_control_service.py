@@ -1,16 +1,45 @@
 import math
+import os
 
 from loguru import logger
 
 from ..config import FanControlSettings
 
 _FAN_MAX_PWM = 255
+# One PWM entry per whole °C, covering any plausible SoC temperature
+_PWM_LUT_SIZE = 128
+
+def _pwm_for_speed(speed_percent: float) -> int:
+    """Converts a speed percentage to a PWM value (0-255), rounding up."""
+    return max(0, min(_FAN_MAX_PWM, int(math.ceil((speed_percent / 100.0) * _FAN_MAX_PWM))))
 
 class FanControlService:
     """Service responsible for adjusting fan speed based on temperature."""
 
     def __init__(self):
         self._last_pwm_written: int | None = None
+        # Open sysfs descriptors by path, reused across writes to avoid open()/close() per adjustment
+        self._fds: dict[str, int] = {}
+        # PWM per whole °C for the last config seen (None if its curve needs exact lookups)
+        self._lut_config: FanControlSettings | None = None
+        self._pwm_lut: bytes | None = None
+
+    def _ensure_fd(self, path: str) -> int:
+        """Returns a cached write-only descriptor for `path`, opening it on first use."""
+        fd = self._fds.get(path)
+        if fd is None:
+            fd = os.open(path, os.O_WRONLY)
+            self._fds[path] = fd
+        return fd
+
+    def _drop_fd(self, path: str) -> None:
+        """Closes and forgets the descriptor for `path` so the next write reopens it."""
+        fd = self._fds.pop(path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
 
     def _write_to_sysfs(self, path: str | None, value: str) -> bool:
         """Helper to write a value to a sysfs path."""
@@ -18,8 +47,8 @@ class FanControlService:
             logger.debug("Sysfs path is None, skipping write.")
             return False
         try:
-            with open(path, 'w') as f:
-                f.write(value)
+            # sysfs attributes take the whole value in one write at offset 0
+            os.pwrite(self._ensure_fd(path), value.encode(), 0)
             logger.debug(f"Successfully wrote '{value}' to '{path}'")
             return True
         except FileNotFoundError:
@@ -28,8 +57,26 @@ class FanControlService:
             logger.error(f"Permission denied writing '{value}' to '{path}'. Check user permissions/groups (e.g., hwmon) or udev rules.")
         except Exception as e:
             logger.error(f"Failed to write '{value}' to '{path}': {e}")
+        # The descriptor may be stale (e.g. hwmon re-enumerated); reopen on the next attempt
+        self._drop_fd(path)
         return False
 
+    def close(self) -> None:
+        """Closes all cached sysfs descriptors (call on shutdown)."""
+        for path in list(self._fds):
+            self._drop_fd(path)
+
+    def _pwm_lut_for(self, config: FanControlSettings) -> bytes | None:
+        """Returns the PWM lookup table for `config`, building it when the config changes."""
+        if config is not self._lut_config:
+            self._lut_config = config
+            # Flooring to whole degrees only matches the curve if every threshold is a whole degree
+            if all(float(p.temp).is_integer() for p in config.curve):
+                self._pwm_lut = bytes(_pwm_for_speed(config.speed_for(t)) for t in range(_PWM_LUT_SIZE))
+            else:
+                self._pwm_lut = None
+        return self._pwm_lut
+
     def set_fan_manual_mode(self, config: FanControlSettings) -> bool:
         """Attempts to set the fan to manual PWM control mode."""
         logger.debug(f"Attempting to set fan manual mode using enable_path: {config.enable_path}")
@@ -42,21 +89,16 @@ class FanControlService:
             logger.debug("Fan control disabled or curve is empty. Skipping adjustment.")
             return
 
-        target_speed_percent = 0.0
-        # Find the appropriate speed from the curve (must be sorted)
-        for point in config.curve:
-            if current_temp >= point.temp:
-                target_speed_percent = point.speed
-            else:
-                # Since curve is sorted, we found the first point ABOVE current temp
-                break
-
-        # Convert percentage to PWM value (0-255)
-        target_pwm = max(0, min(_FAN_MAX_PWM, int(math.ceil((target_speed_percent / 100.0) * _FAN_MAX_PWM))))
+        pwm_lut = self._pwm_lut_for(config)
+        if pwm_lut is not None and 0 <= current_temp < _PWM_LUT_SIZE:
+            target_pwm = pwm_lut[int(current_temp)]
+        else:
+            # Fractional thresholds or out-of-table temperatures: bisect the curve
+            target_pwm = _pwm_for_speed(config.speed_for(current_temp))
 
         # Only write if the PWM value needs to change
         if target_pwm != self._last_pwm_written:
-            logger.info(f"CPU Temp: {current_temp:.1f}°C. Setting fan speed to {target_speed_percent:.0f}% (PWM: {target_pwm})")
+            logger.info(f"CPU Temp: {current_temp:.1f}°C. Setting fan speed to {target_pwm * 100 / _FAN_MAX_PWM:.0f}% (PWM: {target_pwm})")
 
             # Ensure manual mode is set (might be optional depending on hardware)
             # Doing this every time ensures it stays in manual mode
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Metric
+from ..repositories import MetricRepository
+
+# Cached latest metric; "t" is the perf_counter() time it was stored and "gen" counts
+# external updates, so a query that raced with one can tell its result is outdated
+_LATEST_CACHE: dict[str, Any] = {"t": float("-inf"), "v": None, "gen": 0}
+_LATEST_LOCK = asyncio.Lock()
+
+def invalidate_latest() -> None:
+    """Drops the cached latest metric so the next read goes to the database."""
+    _LATEST_CACHE["t"] = float("-inf")
+    _LATEST_CACHE["gen"] += 1
+
+def set_latest(metric: Metric) -> None:
+    """Stores a metric this process just inserted, so reads skip the database until the TTL expires.
+
+    Only called from the event loop thread and never awaits, so it needs no lock.
+    """
+    _LATEST_CACHE["v"] = metric
+    _LATEST_CACHE["t"] = time.perf_counter()
+    _LATEST_CACHE["gen"] += 1
+
+async def get_latest_cached(session: AsyncSession, ttl: float) -> Metric | None:
+    """Returns the latest metric, querying the database at most once per `ttl` seconds."""
+    if time.perf_counter() - _LATEST_CACHE["t"] < ttl:
+        return _LATEST_CACHE["v"]
+
+    async with _LATEST_LOCK:
+        # Another caller may have refreshed the cache while we waited
+        if time.perf_counter() - _LATEST_CACHE["t"] < ttl:
+            return _LATEST_CACHE["v"]
+
+        gen = _LATEST_CACHE["gen"]
+        latest_metric = await MetricRepository(session).get_latest()
+        if _LATEST_CACHE["gen"] != gen:
+            # The cache changed while we queried: a set_latest() row is newer than our snapshot,
+            # and after an invalidation our snapshot may already be stale, so store nothing
+            if _LATEST_CACHE["t"] != float("-inf"):
+                return _LATEST_CACHE["v"]
+            return latest_metric
+        _LATEST_CACHE["v"] = latest_metric
+        _LATEST_CACHE["t"] = time.perf_counter()
+    return latest_metric
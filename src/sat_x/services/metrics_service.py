@@ -1,3 +1,5 @@
+import os
+import threading
 
 import psutil
 from loguru import logger
@@ -6,10 +8,103 @@ from loguru import logger
 # This might need adjustment depending on the exact kernel/OS setup
 _FAN_PWM_SYSFS_PATH = "/sys/class/thermal/cooling_device0/cur_state"
 _FAN_MAX_PWM = 255.0 # Standard max PWM value
+# CPU temperature in millidegrees Celsius (cpu-thermal on the RPi)
+_CPU_TEMP_SYSFS_PATH = "/sys/class/thermal/thermal_zone0/temp"
+# psutil.sensors_temperatures() keys tried, in order, when the sysfs file is missing
+_CPU_SENSOR_KEYS = ("cpu_thermal", "coretemp")
+
+class _SysfsIntFile:
+    """A sysfs attribute holding one integer, read through a descriptor opened on first use."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+        # Checked once up front (and again if the open fails) so missing files never raise per read
+        self.unavailable = not os.path.exists(path)
+        if self.unavailable:
+            logger.debug(f"Sysfs path not found: '{path}'. Not reading it.")
+        # Readers run in worker threads; guards the lazy open
+        self._lock = threading.Lock()
+
+    def read(self) -> int | None:
+        """Returns the current value, or None if the file is missing or unparsable."""
+        if self.unavailable:
+            return None
+        fd = self._fd
+        if fd is None:
+            with self._lock:
+                if self._fd is None:
+                    try:
+                        self._fd = os.open(self.path, os.O_RDONLY)
+                    except FileNotFoundError:
+                        self.unavailable = True
+                        logger.debug(f"Sysfs path not found: '{self.path}'. Not reading it again.")
+                        return None
+                fd = self._fd
+        try:
+            # sysfs values are tiny, a single pread at offset 0 refreshes the attribute
+            value_bytes = os.pread(fd, 16, 0).strip()
+        except OSError:
+            self.close() # Reopen on the next read in case the device went away
+            raise
+        try:
+            return int(value_bytes)
+        except ValueError:
+            logger.warning(f"Could not parse integer from '{self.path}': {value_bytes!r}.")
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            fd, self._fd = self._fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
 
 class MetricsService:
     """Service responsible for collecting system metrics."""
 
+    def __init__(self, fan_pwm_path: str = _FAN_PWM_SYSFS_PATH, cpu_temp_path: str = _CPU_TEMP_SYSFS_PATH):
+        self._fan_pwm = _SysfsIntFile(fan_pwm_path)
+        self._cpu_temp = _SysfsIntFile(cpu_temp_path)
+        self._sensor_key: str | None = None # psutil fallback, resolved on first use
+        self._has_sensors_temperatures = hasattr(psutil, "sensors_temperatures") # Platform-dependent
+        # Prime psutil's CPU counters so the first non-blocking cpu_percent() has a baseline
+        psutil.cpu_percent(interval=None)
+
+    def _read_fan_pwm(self) -> int | None:
+        """Reads the fan PWM value through a cached descriptor."""
+        return self._fan_pwm.read()
+
+    def _read_cpu_temp(self) -> float | None:
+        """CPU temperature in °C, from sysfs directly or else via psutil."""
+        millidegrees = self._cpu_temp.read()
+        if millidegrees is not None:
+            return millidegrees / 1000.0
+        if not self._cpu_temp.unavailable:
+            return None # Present but unparsable; already logged
+        if not self._has_sensors_temperatures:
+            logger.debug("psutil.sensors_temperatures not available on this system.")
+            return None
+
+        temps = psutil.sensors_temperatures()
+        if self._sensor_key not in temps:
+            self._sensor_key = next((key for key in _CPU_SENSOR_KEYS if key in temps), None)
+        if self._sensor_key and temps[self._sensor_key]:
+            # Take the first sensor reading for the key
+            return temps[self._sensor_key][0].current
+        logger.debug(f"Could not find a known CPU temperature sensor key in {list(temps.keys())}")
+        return None
+
+    def get_cpu_temperature(self) -> float | None:
+        """Collects only the CPU temperature (°C), for callers that don't need the full set."""
+        try:
+            return self._read_cpu_temp()
+        except Exception as e:
+            logger.warning(f"Could not collect CPU Temperature metrics: {e}")
+            return None
+
     def get_system_metrics(self) -> dict[str, float | None]:
         """Collects CPU, Memory, Disk usage, Temp, and Fan speed."""
         metrics: dict[str, float | None] = {
@@ -20,7 +115,8 @@ class MetricsService:
             "fan_speed_percent": None,
         }
         try:
-            metrics["cpu_percent"] = psutil.cpu_percent(interval=0.1) # Short interval for responsiveness
+            # Non-blocking: utilisation since the previous call (primed in __init__)
+            metrics["cpu_percent"] = psutil.cpu_percent(interval=None)
         except Exception as e:
             logger.warning(f"Could not collect CPU metrics: {e}")
 
@@ -39,44 +135,19 @@ class MetricsService:
             logger.warning(f"Could not collect Disk usage metrics: {e}")
 
         # --- Collect CPU Temperature ---
-        try:
-            if hasattr(psutil, "sensors_temperatures"):
-                temps = psutil.sensors_temperatures()
-                # RPi typically uses 'cpu_thermal' or similar
-                # Adapt key if necessary based on `print(temps)`
-                sensor_key = None
-                if 'cpu_thermal' in temps:
-                    sensor_key = 'cpu_thermal'
-                elif 'coretemp' in temps: # Fallback for other systems
-                    sensor_key = 'coretemp'
-                # Add other potential keys if needed
-
-                if sensor_key and temps[sensor_key]:
-                    # Take the first sensor reading for the key
-                    metrics["cpu_temp_celsius"] = temps[sensor_key][0].current
-                else:
-                    logger.debug(f"Could not find a known CPU temperature sensor key in {list(temps.keys())}")
-            else:
-                 logger.debug("psutil.sensors_temperatures not available on this system.")
-        except Exception as e:
-            logger.warning(f"Could not collect CPU Temperature metrics: {e}")
+        metrics["cpu_temp_celsius"] = self.get_cpu_temperature()
 
         # --- Collect Fan Speed Percentage (RPi specific) ---
-        try:
-            with open(_FAN_PWM_SYSFS_PATH) as f:
-                pwm_value_str = f.read().strip()
-                try:
-                    pwm_value = int(pwm_value_str)
+        if not self._fan_pwm.unavailable: # Hosts without the fan file skip this entirely
+            try:
+                pwm_value = self._read_fan_pwm()
+                if pwm_value is not None:
                     # Convert PWM value (0-255) to percentage
                     metrics["fan_speed_percent"] = max(0.0, min(100.0, (pwm_value / _FAN_MAX_PWM) * 100.0))
-                except ValueError:
-                     logger.warning(f"Could not parse fan PWM value from '{_FAN_PWM_SYSFS_PATH}': '{pwm_value_str}' is not an integer.")
-        except FileNotFoundError:
-            logger.debug(f"Fan speed sysfs path not found: '{_FAN_PWM_SYSFS_PATH}'. Fan speed monitoring disabled.")
-        except PermissionError:
-            logger.warning(f"Permission denied reading fan speed from '{_FAN_PWM_SYSFS_PATH}'.")
-        except Exception as e:
-            logger.warning(f"Could not collect Fan Speed metrics from '{_FAN_PWM_SYSFS_PATH}': {e}")
+            except PermissionError:
+                logger.warning(f"Permission denied reading fan speed from '{self._fan_pwm.path}'.")
+            except Exception as e:
+                logger.warning(f"Could not collect Fan Speed metrics from '{self._fan_pwm.path}': {e}")
 
 
         logger.debug(f"Collected metrics: {metrics}")
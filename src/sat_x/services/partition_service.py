@@ -0,0 +1,128 @@
+import datetime
+import re
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ..models import Metric
+
+# PostgreSQL only: the metrics table is range-partitioned by day so old data can be
+# dropped a partition at a time instead of DELETEd (which bloats the table).
+# Mirrors models.Metric; the primary key must include the partition key.
+CREATE_PARTITIONED_METRICS = text("""
+CREATE TABLE IF NOT EXISTS metrics (
+    id BIGSERIAL,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    cpu_percent DOUBLE PRECISION,
+    memory_percent DOUBLE PRECISION,
+    disk_usage_percent DOUBLE PRECISION,
+    cpu_temp_celsius DOUBLE PRECISION,
+    fan_speed_percent DOUBLE PRECISION,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp)
+""")
+# Catches rows outside every daily partition (e.g. clock jumps) instead of failing the INSERT
+CREATE_DEFAULT_PARTITION = text("CREATE TABLE IF NOT EXISTS metrics_default PARTITION OF metrics DEFAULT")
+
+_PARTITION_NAME = re.compile(r"^metrics_(\d{4})_(\d{2})_(\d{2})$")
+
+def partition_name(day: datetime.date) -> str:
+    return f"metrics_{day:%Y_%m_%d}"
+
+def _day_bounds(day: datetime.date) -> tuple[datetime.datetime, datetime.datetime]:
+    """UTC midnight at the start of `day` and of the next day."""
+    start = datetime.datetime.combine(day, datetime.time(), tzinfo=datetime.UTC)
+    return start, start + datetime.timedelta(days=1)
+
+def create_partition_sql(day: datetime.date) -> str:
+    """DDL for the partition holding `day` (UTC midnight to midnight)."""
+    start, end = _day_bounds(day)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF metrics "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    """True if `metrics` is a partitioned table (older databases have a plain one)."""
+    # EXISTS gives a real boolean; pg_class.relkind is a "char" that asyncpg returns as bytes
+    result = await conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('metrics'))"
+    ))
+    return bool(result.scalar())
+
+async def create_partitioned_metrics(conn: AsyncConnection) -> bool:
+    """Creates the partitioned parent table, its default partition and indexes if missing.
+
+    Returns False (and changes nothing) if an older, unpartitioned `metrics` table exists.
+    """
+    await conn.execute(CREATE_PARTITIONED_METRICS)
+    if not await is_partitioned(conn):
+        logger.warning("Table 'metrics' exists but is not partitioned; partition maintenance is disabled.")
+        return False
+    await conn.execute(CREATE_DEFAULT_PARTITION)
+    # create_all skips indexes of tables that already exist, so create them here;
+    # indexes on the parent are propagated to every partition
+    for index in Metric.__table__.indexes:
+        await conn.run_sync(index.create, checkfirst=True)
+    return True
+
+async def ensure_partitions(conn: AsyncConnection, today: datetime.date, days_ahead: int) -> None:
+    """Creates the daily partitions from `today` through `today + days_ahead`.
+
+    Each partition is created in its own savepoint, so one failure is logged and skipped
+    without aborting the caller's transaction (startup, or retention in the same run).
+    """
+    for offset in range(days_ahead + 1):
+        day = today + datetime.timedelta(days=offset)
+        try:
+            async with conn.begin_nested():
+                await _create_partition(conn, day)
+        except Exception as e:
+            logger.error(f"Could not create metric partition {partition_name(day)}: {e}")
+
+async def _create_partition(conn: AsyncConnection, day: datetime.date) -> None:
+    """Creates the partition for `day`, first moving any of its rows out of the default partition.
+
+    PostgreSQL refuses to create a partition whose range already has rows in the default
+    partition (e.g. after the clock jumped forward), so those rows are re-routed.
+    """
+    name = partition_name(day)
+    if (await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})).scalar():
+        return
+    start, end = _day_bounds(day)
+    bounds = {"start": start, "end": end}
+    in_range = "timestamp >= :start AND timestamp < :end"
+    stranded = (await conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM metrics_default WHERE {in_range})"), bounds)).scalar()
+    if not stranded:
+        await conn.execute(text(create_partition_sql(day)))
+        return
+
+    await conn.execute(text("ALTER TABLE metrics DETACH PARTITION metrics_default"))
+    await conn.execute(text(create_partition_sql(day)))
+    moved = await conn.execute(text(f"INSERT INTO metrics SELECT * FROM metrics_default WHERE {in_range}"), bounds)
+    await conn.execute(text(f"DELETE FROM metrics_default WHERE {in_range}"), bounds)
+    await conn.execute(text("ALTER TABLE metrics ATTACH PARTITION metrics_default DEFAULT"))
+    logger.info(f"Moved {moved.rowcount} metric rows from metrics_default into {name}")
+
+async def drop_expired_partitions(conn: AsyncConnection, today: datetime.date, retention_days: int) -> list[str]:
+    """Drops daily partitions entirely older than `retention_days`. Returns the dropped names."""
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('metrics')"
+    ))
+    cutoff = today - datetime.timedelta(days=retention_days)
+    dropped = []
+    for name in result.scalars():
+        match = _PARTITION_NAME.match(name)
+        if match and datetime.date(*map(int, match.groups())) < cutoff:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    # Out-of-range rows in the default partition expire too
+    await conn.execute(
+        text("DELETE FROM metrics_default WHERE timestamp < :cutoff"),
+        {"cutoff": _day_bounds(cutoff)[0]},
+    )
+    if dropped:
+        logger.info(f"Dropped expired metric partitions: {', '.join(dropped)}")
+    return dropped
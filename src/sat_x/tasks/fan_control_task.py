@@ -7,6 +7,7 @@ from ..services.fan_control_service import fan_control_service
 
 # Import the services needed
 from ..services.metrics_service import metrics_service
+from .schedule import TickSchedule
 
 
 async def run_fan_control_task(settings: Settings):
@@ -28,12 +29,18 @@ async def run_fan_control_task(settings: Settings):
     # This might fail due to permissions, the service will log errors
     fan_control_service.set_fan_manual_mode(settings.fan_control)
 
+    try:
+        await _fan_control_loop(settings, interval)
+    finally:
+        fan_control_service.close() # Release cached sysfs descriptors
+
+async def _fan_control_loop(settings: Settings, interval: int):
+    """Reads the CPU temperature and adjusts the fan every `interval` seconds."""
+    schedule = TickSchedule(interval)
     while True:
         try:
-            # Get current CPU temperature
-            # We get all metrics, but only need temp here
-            current_metrics = metrics_service.get_system_metrics()
-            cpu_temp = current_metrics.get("cpu_temp_celsius")
+            # Get current CPU temperature (only the temp, not the full metrics bundle)
+            cpu_temp = await asyncio.to_thread(metrics_service.get_cpu_temperature)
 
             if cpu_temp is not None:
                 # Adjust fan speed based on the current temperature
@@ -45,4 +52,4 @@ async def run_fan_control_task(settings: Settings):
             # Catch broad exceptions here to prevent the loop from crashing
             logger.error(f"Unhandled error in fan control loop: {e}", exc_info=True)
 
-        await asyncio.sleep(interval)
+        await schedule.sleep()
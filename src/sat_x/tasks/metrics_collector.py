@@ -1,35 +1,157 @@
 import asyncio
+import datetime
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
 
 from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import Settings
 from ..database import AsyncSessionFactory  # Use the factory to create sessions
 from ..models import Metric
-from ..repositories import MetricRepository
+from ..services.latest_metric_cache import invalidate_latest, set_latest
 from ..services.metrics_service import metrics_service  # Import the service
+from .schedule import TickSchedule
 
+# Cap on buffered rows kept for retry while the database is unavailable
+_MAX_BUFFERED_BATCHES = 10
+# Samples arrive on a fixed schedule but with some jitter; a flush that is due within this
+# fraction of flush_interval is taken now, so interval == flush_interval still flushes every tick
+_FLUSH_SLACK = 0.01
+# Column order of MetricSample.as_record(), for PostgreSQL binary COPY
+_COPY_COLUMNS = ("timestamp", "cpu_percent", "memory_percent", "disk_usage_percent", "cpu_temp_celsius", "fan_speed_percent")
 
-async def collect_and_store_metrics(session: AsyncSession):
-    """Collects metrics using the service and stores them using the repository."""
-    collected_data = metrics_service.get_system_metrics()
 
-    # Create a Metric ORM object from the collected data
-    metric = Metric(
+@dataclass(slots=True)
+class MetricSample:
+    """One buffered sample; slots keep it far smaller than a dict or Metric instance."""
+    timestamp: datetime.datetime
+    cpu_percent: float | None
+    memory_percent: float | None
+    disk_usage_percent: float | None
+    cpu_temp_celsius: float | None
+    fan_speed_percent: float | None
+
+    def as_row(self) -> dict[str, Any]:
+        """INSERT parameters for this sample (flat fields, so no need for dataclasses.asdict's deep copy)."""
+        return {
+            "timestamp": self.timestamp,
+            "cpu_percent": self.cpu_percent,
+            "memory_percent": self.memory_percent,
+            "disk_usage_percent": self.disk_usage_percent,
+            "cpu_temp_celsius": self.cpu_temp_celsius,
+            "fan_speed_percent": self.fan_speed_percent,
+        }
+
+    def as_record(self) -> tuple[Any, ...]:
+        """COPY record for this sample, in `_COPY_COLUMNS` order."""
+        return (
+            self.timestamp,
+            self.cpu_percent,
+            self.memory_percent,
+            self.disk_usage_percent,
+            self.cpu_temp_celsius,
+            self.fan_speed_percent,
+        )
+
+
+class MetricBatch:
+    """In-memory buffer of collected samples, written to the database in one statement."""
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows: deque[MetricSample] = deque(maxlen=batch_size * _MAX_BUFFERED_BATCHES)
+        # Start "overdue" so the first sample after startup is written straight away
+        self._last_flush = float("-inf")
+
+    def append(self, sample: MetricSample) -> None:
+        self.rows.append(sample)
+
+    def due(self) -> bool:
+        """True once the buffer is full or the flush interval has passed."""
+        elapsed = time.monotonic() - self._last_flush
+        return len(self.rows) >= self.batch_size or elapsed >= self.flush_interval * (1 - _FLUSH_SLACK)
+
+    async def flush(self, session: AsyncSession) -> int:
+        """Writes all buffered rows in a single statement and commits. Returns the row count.
+
+        On asyncpg this is a binary COPY; otherwise one INSERT whose newest row is handed
+        to the latest-metric cache, so /metrics/latest needn't query for it.
+        """
+        if not self.rows:
+            return 0
+        # Measured from when the flush starts, so a slow commit doesn't push the next one back
+        started = time.monotonic()
+        connection = await session.connection()
+        if connection.dialect.driver == "asyncpg":
+            raw_connection = await connection.get_raw_connection()
+            try:
+                await raw_connection.driver_connection.copy_records_to_table(
+                    Metric.__tablename__,
+                    records=[sample.as_record() for sample in self.rows],
+                    columns=_COPY_COLUMNS,
+                )
+            except Exception as e:
+                if not _is_asyncpg_connection_error(e):
+                    raise
+                # The raw driver call bypasses SQLAlchemy's error wrapping; surface it as the
+                # OperationalError the task loop rebuilds its session on, and drop the dead connection
+                await connection.invalidate(e)
+                raise OperationalError(f"COPY {Metric.__tablename__}", None, e) from e
+            await session.commit()
+            invalidate_latest() # COPY returns no ids, so let the next read fetch the row
+        else:
+            rows = [sample.as_row() for sample in self.rows]
+            stmt = insert(Metric).returning(Metric.id, Metric.timestamp, sort_by_parameter_order=True)
+            inserted = (await session.execute(stmt, rows)).all()
+            await session.commit()
+            # Cache the timestamp as read back from the database, so cached and queried rows look alike
+            newest_id, newest_timestamp = inserted[-1]
+            set_latest(Metric(**{**rows[-1], "id": newest_id, "timestamp": newest_timestamp}))
+        count = len(self.rows)
+        self.rows.clear()
+        self._last_flush = started
+        return count
+
+
+def _is_asyncpg_connection_error(exc: BaseException) -> bool:
+    """True for native asyncpg errors (or socket errors) meaning the connection is unusable."""
+    import asyncpg  # Only reached on the asyncpg COPY path, so the driver is installed
+
+    return isinstance(exc, (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, OSError))
+
+
+async def collect_and_store_metrics(session: AsyncSession, batch: MetricBatch):
+    """Collects metrics using the service and writes them out once the batch is due."""
+    # psutil and sysfs reads are blocking syscalls; keep them off the event loop
+    collected_data = await asyncio.to_thread(metrics_service.get_system_metrics)
+
+    # Stamp the sample now; a server default would record the flush time instead
+    batch.append(MetricSample(
+        timestamp=datetime.datetime.now(datetime.UTC),
         cpu_percent=collected_data.get("cpu_percent"),
         memory_percent=collected_data.get("memory_percent"),
         disk_usage_percent=collected_data.get("disk_usage_percent"),
         cpu_temp_celsius=collected_data.get("cpu_temp_celsius"),
         fan_speed_percent=collected_data.get("fan_speed_percent"),
-    )
+    ))
+    if not batch.due():
+        return
 
-    # Use the session factory to get a session within the task
-    repo = MetricRepository(session)
     try:
-        await repo.add(metric)
-        await session.commit() # Commit the transaction
-        logger.info(f"Stored new metric record: ID {metric.id}")
+        count = await batch.flush(session)
+        logger.info(f"Stored {count} metric records")
+    except OperationalError:
+        # Connection-level failure: let the task loop replace the session
+        await session.rollback()
+        raise
     except Exception as e:
+        # Rows stay buffered (up to the deque's maxlen) and are retried on the next flush
         await session.rollback()
         logger.error(f"Failed to store metrics: {e}", exc_info=True)
 
@@ -40,14 +162,33 @@ async def run_metrics_collector_task(settings: Settings):
         return
 
     interval = settings.tasks.metrics.interval_seconds
+    batch = MetricBatch(settings.tasks.metrics.batch_size, settings.tasks.metrics.flush_interval_seconds)
     logger.info(f"Starting metrics collector task with interval: {interval}s")
 
-    while True:
+    # One session for the task's lifetime instead of a new one every tick
+    session = AsyncSessionFactory()
+    schedule = TickSchedule(interval)
+    try:
+        while True:
+            try:
+                await collect_and_store_metrics(session, batch)
+            except OperationalError as e:
+                # Buffered rows are kept; retry on a fresh session next tick
+                logger.warning(f"Database error in metrics collector, reopening session: {e}")
+                await session.close()
+                session = AsyncSessionFactory()
+            except Exception as e:
+                # Catch broad exceptions here to prevent the loop from crashing
+                logger.error(f"Unhandled error in metrics collector loop: {e}", exc_info=True)
+
+            await schedule.sleep()
+    finally:
+        # Don't lose buffered samples on shutdown
         try:
-            async with AsyncSessionFactory() as session:
-                await collect_and_store_metrics(session)
+            if batch.rows:
+                count = await batch.flush(session)
+                logger.info(f"Flushed {count} buffered metric records on shutdown")
         except Exception as e:
-            # Catch broad exceptions here to prevent the loop from crashing
-            logger.error(f"Unhandled error in metrics collector loop: {e}", exc_info=True)
-
-        await asyncio.sleep(interval)
+            logger.error(f"Failed to flush buffered metrics on shutdown: {e}")
+        finally:
+            await session.close()
@@ -0,0 +1,40 @@
+import datetime
+
+from loguru import logger
+
+from ..config import Settings
+from ..database import engine
+from ..services import partition_service
+from .schedule import TickSchedule
+
+
+async def maintain_partitions(settings: Settings) -> None:
+    """Creates upcoming daily partitions and drops the expired ones."""
+    partitions = settings.tasks.partitions
+    today = datetime.datetime.now(datetime.UTC).date()
+    async with engine.begin() as conn:
+        if not await partition_service.is_partitioned(conn):
+            return
+        await partition_service.ensure_partitions(conn, today, partitions.premake_days)
+        await partition_service.drop_expired_partitions(conn, today, partitions.retention_days)
+
+async def run_partition_task(settings: Settings):
+    """Periodically maintains the day partitions of the metrics table (PostgreSQL only)."""
+    if not settings.tasks.partitions.enabled:
+        logger.info("Partition maintenance task is disabled in settings.")
+        return
+    if engine.dialect.name != "postgresql":
+        logger.info(f"Partition maintenance is not supported on '{engine.dialect.name}'. Task will not run.")
+        return
+
+    interval = settings.tasks.partitions.interval_seconds
+    logger.info(f"Starting partition maintenance task with interval: {interval}s")
+    schedule = TickSchedule(interval)
+    while True:
+        try:
+            await maintain_partitions(settings)
+        except Exception as e:
+            # Catch broad exceptions here to prevent the loop from crashing
+            logger.error(f"Unhandled error in partition maintenance loop: {e}", exc_info=True)
+
+        await schedule.sleep()
@@ -0,0 +1,25 @@
+import asyncio
+import time
+
+from loguru import logger
+
+
+class TickSchedule:
+    """Fixed-rate schedule on the monotonic clock, so loop bodies don't add drift.
+
+    Ticks that a slow body overran are skipped rather than run back to back.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_tick = time.monotonic() + interval
+
+    async def sleep(self) -> None:
+        """Sleeps until the next tick that is still in the future."""
+        now = time.monotonic()
+        if now > self._next_tick:
+            missed = int((now - self._next_tick) // self.interval) + 1
+            logger.warning(f"Loop body overran its {self.interval}s interval; skipping {missed} tick(s).")
+            self._next_tick += missed * self.interval
+        await asyncio.sleep(self._next_tick - now)
+        self._next_tick += self.interval
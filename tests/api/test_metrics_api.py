@@ -1,12 +1,17 @@
+import json
+import sys
 from collections.abc import AsyncGenerator
 from datetime import UTC, datetime, timedelta
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from sat_x.api import schemas
+from sat_x.config import Settings
 from sat_x.database import get_db_session  # Import the original dependency getter
 from sat_x.models import Metric
 from sat_x.repositories import MetricRepository
@@ -14,6 +19,9 @@ from sat_x.repositories import MetricRepository
 # Mark all tests in this module as async
 # pytestmark = pytest.mark.asyncio
 
+# Hand-serialized responses must still validate against the documented schema
+METRIC_LIST_ADAPTER = TypeAdapter(list[schemas.MetricRead])
+
 # --- Test Health Endpoint ---
 
 def test_health_check(test_client: TestClient):
@@ -22,6 +30,14 @@ def test_health_check(test_client: TestClient):
     assert response.status_code == 200
     assert response.json() == {"status": "OK"}
 
+def test_openapi_declares_metric_schema(test_client: TestClient):
+    """Hand-serialized metric routes still document the MetricRead schema."""
+    response = test_client.get("/openapi.json")
+    assert response.status_code == 200
+    spec = response.json()
+    range_schema = spec["paths"]["/api/v1/metrics/range"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert range_schema["items"]["$ref"] == "#/components/schemas/MetricRead"
+
 # --- Test Metrics Endpoints ---
 
 @pytest.mark.asyncio
@@ -77,8 +93,6 @@ async def test_get_latest_metric_with_data(
         await repo.add(metric1)
         await repo.add(metric2)
         await session.commit() # Commit after adding
-        await session.refresh(metric1)
-        await session.refresh(metric2)
 
         # Act: Call the API endpoint (sync call)
         response = test_client.get("/api/v1/metrics/latest")
@@ -94,6 +108,7 @@ async def test_get_latest_metric_with_data(
 @pytest.mark.asyncio
 async def test_get_metrics_range(
     test_client: TestClient,
+    test_settings: Settings,
     setup_database, # Explicitly request DB setup
     test_session_factory: async_sessionmaker[AsyncSession], # Inject factory
     test_app: FastAPI # Inject test_app to override dependency
@@ -116,15 +131,11 @@ async def test_get_metrics_range(
         await repo.add(metric2)
         await repo.add(metric3)
         await session.commit()
-        await session.refresh(metric1)
-        await session.refresh(metric2)
-        await session.refresh(metric3)
 
         # Need accurate start/end times - get from DB or construct carefully
         start_time = metric1.timestamp
-        # Ensure end_time includes m3 but potentially excludes anything later
-        # Add a small delta to m3's timestamp for safety
-        end_time = metric3.timestamp + timedelta(seconds=1)
+        # Bounds are floored to the collection interval, so leave a full interval after m3
+        end_time = metric3.timestamp + timedelta(seconds=test_settings.tasks.metrics.interval_seconds)
 
         # Act (sync call)
         response = test_client.get(
@@ -140,6 +151,9 @@ async def test_get_metrics_range(
         assert data[1]["id"] == metric2.id
         assert data[2]["id"] == metric3.id
         assert data[0]["cpu_percent"] == 10.0
+        assert METRIC_LIST_ADAPTER.validate_python(data)[2].id == metric3.id
+        assert response.headers["cache-control"] == f"public, max-age={test_settings.tasks.metrics.interval_seconds}"
+        assert response.headers["etag"].startswith('"')
 
 @pytest.mark.asyncio
 async def test_get_metrics_range_invalid_times(
@@ -175,3 +189,167 @@ async def test_get_metrics_range_invalid_times(
 
     # Clean up override after test
     del test_app.dependency_overrides[get_db_session]
+
+@pytest.mark.asyncio
+async def test_get_metrics_range_snaps_to_interval(
+    test_client: TestClient,
+    test_settings: Settings,
+    setup_database, # Explicitly request DB setup
+    test_session_factory: async_sessionmaker[AsyncSession], # Inject factory
+    test_app: FastAPI # Inject test_app to override dependency
+):
+    """Windows that fall in the same interval buckets produce the same ETag."""
+    async with test_session_factory() as session:
+        async def get_override_session() -> AsyncGenerator[AsyncSession, None]:
+            yield session
+        test_app.dependency_overrides[get_db_session] = get_override_session
+
+        bucket = test_settings.tasks.metrics.interval_seconds
+        base = datetime.fromtimestamp(1_700_000_000 // bucket * bucket, UTC)
+        responses = [
+            test_client.get(
+                "/api/v1/metrics/range",
+                params={
+                    "start_time": (base + timedelta(seconds=offset)).isoformat(),
+                    "end_time": (base + timedelta(seconds=bucket * 10 + offset)).isoformat(),
+                },
+            )
+            for offset in (1, bucket - 1)
+        ]
+
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[0].headers["etag"] == responses[1].headers["etag"]
+
+    del test_app.dependency_overrides[get_db_session]
+
+@pytest.mark.asyncio
+async def test_stream_metrics_range_ndjson(
+    test_client: TestClient,
+    test_settings: Settings,
+    setup_database, # Explicitly request DB setup
+    test_session_factory: async_sessionmaker[AsyncSession], # Inject factory
+    test_app: FastAPI # Inject test_app to override dependency
+):
+    """The NDJSON endpoint returns one metric object per line, ordered by timestamp."""
+    async with test_session_factory() as session:
+        async def get_override_session() -> AsyncGenerator[AsyncSession, None]:
+            yield session
+        test_app.dependency_overrides[get_db_session] = get_override_session
+
+        now = datetime.now(UTC)
+        metric1 = Metric(timestamp=now - timedelta(minutes=10), cpu_percent=10.0)
+        metric2 = Metric(timestamp=now - timedelta(minutes=5), cpu_percent=15.0)
+        repo = MetricRepository(session)
+        await repo.add(metric1)
+        await repo.add(metric2)
+        await session.commit()
+
+        end_time = metric2.timestamp + timedelta(seconds=test_settings.tasks.metrics.interval_seconds)
+        response = test_client.get(
+            "/api/v1/metrics/range.ndjson",
+            params={"start_time": metric1.timestamp.isoformat(), "end_time": end_time.isoformat()},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [metric1.id, metric2.id]
+        assert rows[0]["cpu_percent"] == 10.0
+
+    del test_app.dependency_overrides[get_db_session]
+
+async def _add_two_metrics(session: AsyncSession) -> tuple[Metric, Metric]:
+    now = datetime.now(UTC)
+    repo = MetricRepository(session)
+    metric1 = await repo.add(Metric(timestamp=now - timedelta(minutes=10), cpu_percent=10.0))
+    metric2 = await repo.add(Metric(timestamp=now - timedelta(minutes=5), cpu_percent=15.0))
+    await session.commit()
+    return metric1, metric2
+
+@pytest.mark.asyncio
+async def test_get_metrics_range_arrow(
+    test_client: TestClient,
+    test_settings: Settings,
+    setup_database, # Explicitly request DB setup
+    test_session_factory: async_sessionmaker[AsyncSession], # Inject factory
+    test_app: FastAPI # Inject test_app to override dependency
+):
+    """The Arrow endpoint returns the window as one IPC stream of MetricRead columns."""
+    pa = pytest.importorskip("pyarrow")
+    async with test_session_factory() as session:
+        async def get_override_session() -> AsyncGenerator[AsyncSession, None]:
+            yield session
+        test_app.dependency_overrides[get_db_session] = get_override_session
+
+        metric1, metric2 = await _add_two_metrics(session)
+        end_time = metric2.timestamp + timedelta(seconds=test_settings.tasks.metrics.interval_seconds)
+        response = test_client.get(
+            "/api/v1/metrics/range.arrow",
+            params={"start_time": metric1.timestamp.isoformat(), "end_time": end_time.isoformat()},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column("id").to_pylist() == [metric1.id, metric2.id]
+        assert table.column("cpu_percent").to_pylist() == [10.0, 15.0]
+
+    del test_app.dependency_overrides[get_db_session]
+
+@pytest.mark.asyncio
+async def test_get_metrics_range_arrow_without_pyarrow(
+    test_client: TestClient,
+    setup_database, # Explicitly request DB setup
+    test_session_factory: async_sessionmaker[AsyncSession], # Inject factory
+    test_app: FastAPI, # Inject test_app to override dependency
+    monkeypatch: pytest.MonkeyPatch
+):
+    """Without the optional pyarrow extra the endpoint answers 501 instead of failing."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)  # Makes `import pyarrow` raise ImportError
+    async with test_session_factory() as session:
+        async def get_override_session() -> AsyncGenerator[AsyncSession, None]:
+            yield session
+        test_app.dependency_overrides[get_db_session] = get_override_session
+
+        now = datetime.now(UTC)
+        response = test_client.get(
+            "/api/v1/metrics/range.arrow",
+            params={"start_time": (now - timedelta(hours=1)).isoformat(), "end_time": now.isoformat()},
+        )
+
+        assert response.status_code == 501
+
+    del test_app.dependency_overrides[get_db_session]
+
+@pytest.mark.asyncio
+async def test_get_metrics_range_within_one_bucket(
+    test_client: TestClient,
+    test_settings: Settings,
+    setup_database, # Explicitly request DB setup
+    test_session_factory: async_sessionmaker[AsyncSession], # Inject factory
+    test_app: FastAPI # Inject test_app to override dependency
+):
+    """A window shorter than the snapping bucket still returns the rows inside it."""
+    bucket = test_settings.tasks.metrics.interval_seconds
+    async with test_session_factory() as session:
+        async def get_override_session() -> AsyncGenerator[AsyncSession, None]:
+            yield session
+        test_app.dependency_overrides[get_db_session] = get_override_session
+
+        now = datetime.now(UTC)
+        bucket_start = now - timedelta(seconds=now.timestamp() % bucket) - timedelta(seconds=bucket)
+        metric = await MetricRepository(session).add(Metric(timestamp=bucket_start + timedelta(seconds=bucket / 2), cpu_percent=10.0))
+        await session.commit()
+
+        response = test_client.get(
+            "/api/v1/metrics/range",
+            params={
+                "start_time": (bucket_start + timedelta(seconds=bucket / 4)).isoformat(),
+                "end_time": (bucket_start + timedelta(seconds=bucket * 3 / 4)).isoformat(),
+            },
+        )
+
+        assert response.status_code == 200
+        assert [row["id"] for row in response.json()] == [metric.id]
+
+    del test_app.dependency_overrides[get_db_session]
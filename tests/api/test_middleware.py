@@ -0,0 +1,68 @@
+from collections.abc import Generator
+
+import pytest
+from loguru import logger
+from starlette.types import Message, Receive, Scope, Send
+
+from sat_x.api.middleware import AccessLogMiddleware
+
+
+@pytest.fixture
+def log_records() -> Generator[list[dict]]:
+    """Captures loguru records emitted while the test runs."""
+    records: list[dict] = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    yield records
+    logger.remove(handler_id)
+
+def _http_scope(client: tuple[str, int] | None = ("127.0.0.1", 1234)) -> Scope:
+    return {"type": "http", "method": "GET", "path": "/api/v1/health", "client": client, "headers": []}
+
+async def _receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def _collect(middleware: AccessLogMiddleware, scope: Scope) -> list[Message]:
+    sent: list[Message] = []
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    await middleware(scope, _receive, send)
+    return sent
+
+async def test_access_log_records_status_code(log_records: list[dict]):
+    """The status from http.response.start is bound onto the request end record."""
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = await _collect(AccessLogMiddleware(app), _http_scope())
+
+    assert sent[0]["status"] == 404
+    end = next(r for r in log_records if r["message"] == "request end")
+    assert end["extra"]["status"] == 404
+    assert end["extra"]["idem"] == "127.0.0.1:1234 - GET /api/v1/health"
+    assert end["extra"]["ms"] >= 0
+
+async def test_access_log_rejects_missing_client():
+    """Requests without client information get a 400 and never reach the app."""
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        raise AssertionError("app should not be called")
+
+    sent = await _collect(AccessLogMiddleware(app), _http_scope(client=None))
+
+    assert sent[0]["type"] == "http.response.start"
+    assert sent[0]["status"] == 400
+
+async def test_access_log_passes_through_non_http_scopes(log_records: list[dict]):
+    """Lifespan/websocket scopes go straight to the app without logging."""
+    seen: list[Scope] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        seen.append(scope)
+
+    scope: Scope = {"type": "lifespan"}
+    await _collect(AccessLogMiddleware(app), scope)
+
+    assert seen == [scope]
+    assert not any(r["message"].startswith("request") for r in log_records)
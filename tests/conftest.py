@@ -3,20 +3,25 @@ from collections.abc import Generator
 import pytest
 import pytest_asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
+from sat_x.api.middleware import AccessLogMiddleware
 from sat_x.api.routes import router as api_router
-from sat_x.config import Settings, get_settings
+from sat_x.config import MetricsTaskSettings, RuntimeSettings, Settings, get_settings
+from sat_x.config import settings as full_settings
 from sat_x.database import Base
+from sat_x.services.latest_metric_cache import invalidate_latest
 
 
 # --- Test App Instance (without lifespan) ---
 @pytest.fixture(scope="session")
 def test_app() -> FastAPI:
     """Creates a FastAPI instance for testing without the main lifespan."""
-    app = FastAPI(title="Test Sat-X API")
+    app = FastAPI(title="Test Sat-X API", default_response_class=ORJSONResponse)
+    app.add_middleware(AccessLogMiddleware)
     app.include_router(api_router, prefix="/api/v1")
     return app
 
@@ -27,11 +32,11 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 @pytest.fixture(scope="session")
 def test_settings() -> Settings:
     """Overrides settings for testing, notably the database URL."""
-    original_settings = get_settings()
+    original_settings = full_settings
     settings_override = Settings(
         api=original_settings.api,
         database=original_settings.database.model_copy(update={"url": TEST_DATABASE_URL, "echo": False}),
-        tasks=original_settings.tasks.model_copy(update={"metrics": {"enabled": False}})
+        tasks=original_settings.tasks.model_copy(update={"metrics": MetricsTaskSettings(enabled=False)})
     )
     return settings_override
 
@@ -45,8 +50,10 @@ def test_client(
 ) -> Generator[TestClient, None, None]:
     """Provides a synchronous TestClient using a lifespan-free app."""
 
-    def get_override_settings() -> Settings:
-        return test_settings
+    override_settings = RuntimeSettings.from_settings(test_settings)
+
+    def get_override_settings() -> RuntimeSettings:
+        return override_settings
 
     test_app.dependency_overrides.clear()
     test_app.dependency_overrides[get_settings] = get_override_settings
@@ -85,6 +92,7 @@ async def setup_database(test_engine):
         # Drop tables first to ensure a clean state, then create
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    invalidate_latest() # Don't serve a latest metric cached by a previous test
     yield # Run the test function
     # Drop after is still good practice
     async with test_engine.begin() as conn:
@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from sat_x.config import FanControlSettings, FanCurvePoint
+from sat_x.services.fan_control_service import FanControlService
+
+
+@pytest.fixture
+def fan_config(tmp_path: Path) -> FanControlSettings:
+    """Fan settings pointing at writable temp files instead of sysfs."""
+    control = tmp_path / "pwm1"
+    enable = tmp_path / "pwm1_enable"
+    control.write_text("0")
+    enable.write_text("0")
+    return FanControlSettings(
+        enabled=True,
+        control_path=str(control),
+        enable_path=str(enable),
+        curve=[
+            FanCurvePoint(temp=0, speed=0),
+            FanCurvePoint(temp=30, speed=30),
+            FanCurvePoint(temp=65, speed=70),
+            FanCurvePoint(temp=75, speed=100),
+        ],
+    )
+
+@pytest.mark.parametrize(
+    ("temp", "expected_pwm"),
+    [(-5.0, 0), (29.9, 0), (30.0, 77), (64.9, 77), (65.0, 179), (80.0, 255), (130.0, 255)],
+)
+def test_adjust_fan_speed_follows_step_curve(fan_config: FanControlSettings, temp: float, expected_pwm: int):
+    """The PWM written is the speed of the last curve point at or below the temperature."""
+    service = FanControlService()
+
+    service.adjust_fan_speed(temp, fan_config)
+
+    assert Path(fan_config.control_path).read_text() == str(expected_pwm)
+    assert Path(fan_config.enable_path).read_text() == "1"
+
+def test_sysfs_descriptors_are_reused_and_closed(fan_config: FanControlSettings, monkeypatch: pytest.MonkeyPatch):
+    """Repeated writes reuse one descriptor per path; close() releases them."""
+    opened: list[str] = []
+    real_open = os.open
+    monkeypatch.setattr("sat_x.services.fan_control_service.os.open", lambda path, flags: opened.append(path) or real_open(path, flags))
+    service = FanControlService()
+
+    for temp in (30.0, 65.0, 80.0):
+        service.adjust_fan_speed(temp, fan_config)
+
+    assert Path(fan_config.control_path).read_text() == "255"
+    assert opened.count(fan_config.control_path) == 1
+
+    service.close()
+
+    assert service._fds == {}
+
+def test_fractional_curve_thresholds_skip_the_lookup_table(fan_config: FanControlSettings):
+    """Curves with non-integer thresholds are looked up exactly instead of per whole degree."""
+    fan_config.curve[2] = FanCurvePoint(temp=64.5, speed=70)
+    service = FanControlService()
+
+    service.adjust_fan_speed(64.7, fan_config)
+
+    assert service._pwm_lut is None
+    assert Path(fan_config.control_path).read_text() == "179"
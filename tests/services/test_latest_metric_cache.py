@@ -0,0 +1,73 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sat_x.models import Metric
+from sat_x.repositories import MetricRepository
+from sat_x.services.latest_metric_cache import get_latest_cached, invalidate_latest, set_latest
+
+
+@pytest.fixture
+def count_get_latest(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Counts calls to MetricRepository.get_latest while still running the query."""
+    calls = [0]
+    original = MetricRepository.get_latest
+
+    async def counting_get_latest(self: MetricRepository) -> Metric | None:
+        calls[0] += 1
+        return await original(self)
+
+    monkeypatch.setattr(MetricRepository, "get_latest", counting_get_latest)
+    return calls
+
+async def test_get_latest_cached_reuses_value_within_ttl(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession],
+    count_get_latest: list[int]
+):
+    """A second read within the TTL is served from memory, even if a row was added."""
+    async with test_session_factory() as session:
+        assert await get_latest_cached(session, ttl=60) is None
+
+        session.add(Metric(timestamp=datetime.now(UTC), cpu_percent=10.0))
+        await session.commit()
+
+        assert await get_latest_cached(session, ttl=60) is None
+        assert count_get_latest[0] == 1
+
+async def test_invalidate_latest_forces_reread(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession],
+    count_get_latest: list[int]
+):
+    """invalidate_latest() makes the next read go back to the database."""
+    async with test_session_factory() as session:
+        assert await get_latest_cached(session, ttl=60) is None
+
+        metric = Metric(timestamp=datetime.now(UTC), cpu_percent=10.0)
+        session.add(metric)
+        await session.commit()
+        invalidate_latest()
+
+        latest = await get_latest_cached(session, ttl=60)
+        assert latest is not None
+        assert latest.id == metric.id
+        assert count_get_latest[0] == 2
+
+async def test_set_latest_during_query_is_not_overwritten(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """A row stored by the collector while a read is in flight wins over the read's older snapshot."""
+    newer = Metric(id=99, timestamp=datetime.now(UTC), cpu_percent=20.0)
+
+    async def racing_get_latest(self: MetricRepository) -> Metric | None:
+        set_latest(newer)  # The collector flushes while the query is awaiting
+        return None
+
+    monkeypatch.setattr(MetricRepository, "get_latest", racing_get_latest)
+    async with test_session_factory() as session:
+        assert await get_latest_cached(session, ttl=60) is newer
+        assert await get_latest_cached(session, ttl=60) is newer
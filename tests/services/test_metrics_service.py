@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from sat_x.services.metrics_service import MetricsService
+
+
+def test_fan_pwm_is_read_through_one_descriptor(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """The PWM file is opened once and re-read on later calls."""
+    pwm = tmp_path / "cur_state"
+    pwm.write_text("255\n")
+    opened: list[str] = []
+    real_open = os.open
+    monkeypatch.setattr("sat_x.services.metrics_service.os.open", lambda path, flags: opened.append(path) or real_open(path, flags))
+    service = MetricsService(fan_pwm_path=str(pwm))
+
+    assert service._read_fan_pwm() == 255
+    pwm.write_text("51\n")  # same inode, rewritten in place
+    assert service._read_fan_pwm() == 51
+    assert opened == [str(pwm)]
+
+def test_missing_fan_pwm_path_is_never_opened(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """A missing PWM file is detected up front, so reads never try to open it."""
+    calls = 0
+    real_open = os.open
+
+    def counting_open(path, flags):
+        nonlocal calls
+        calls += 1
+        return real_open(path, flags)
+
+    monkeypatch.setattr("sat_x.services.metrics_service.os.open", counting_open)
+    service = MetricsService(fan_pwm_path=str(tmp_path / "missing"))
+
+    assert service._read_fan_pwm() is None
+    assert service._read_fan_pwm() is None
+    assert calls == 0
+
+def test_cpu_temp_is_read_from_sysfs_in_millidegrees(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """The thermal zone file is used directly, without psutil's sensor enumeration."""
+    temp = tmp_path / "temp"
+    temp.write_text("48312\n")
+    monkeypatch.setattr(psutil, "sensors_temperatures", lambda: pytest.fail("psutil should not be queried"), raising=False)
+    service = MetricsService(fan_pwm_path=str(tmp_path / "missing"), cpu_temp_path=str(temp))
+
+    assert service._read_cpu_temp() == 48.312
+
+def test_cpu_temp_falls_back_to_psutil_sensor_key(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Without the sysfs file, the psutil sensor key is resolved once and reused."""
+    reading = SimpleNamespace(current=51.0)
+    monkeypatch.setattr(psutil, "sensors_temperatures", lambda: {"acpitz": [], "coretemp": [reading]}, raising=False)
+    service = MetricsService(fan_pwm_path=str(tmp_path / "missing"), cpu_temp_path=str(tmp_path / "missing"))
+
+    assert service._read_cpu_temp() == 51.0
+    assert service._sensor_key == "coretemp"
+    assert service._read_cpu_temp() == 51.0
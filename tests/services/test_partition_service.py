@@ -0,0 +1,14 @@
+import datetime
+
+from sat_x.services.partition_service import create_partition_sql, partition_name
+
+
+def test_partition_covers_one_utc_day():
+    """Each partition spans UTC midnight to the next midnight."""
+    day = datetime.date(2024, 12, 31)
+
+    assert partition_name(day) == "metrics_2024_12_31"
+    assert create_partition_sql(day) == (
+        "CREATE TABLE IF NOT EXISTS metrics_2024_12_31 PARTITION OF metrics "
+        "FOR VALUES FROM ('2024-12-31T00:00:00+00:00') TO ('2025-01-01T00:00:00+00:00')"
+    )
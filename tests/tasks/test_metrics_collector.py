@@ -0,0 +1,175 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sat_x.models import Metric
+from sat_x.repositories import MetricRepository
+from sat_x.services.latest_metric_cache import get_latest_cached
+from sat_x.services.metrics_service import metrics_service
+from sat_x.tasks import metrics_collector
+from sat_x.tasks.metrics_collector import _COPY_COLUMNS, MetricBatch, MetricSample, collect_and_store_metrics
+
+SAMPLE = {
+    "cpu_percent": 12.5,
+    "memory_percent": 40.0,
+    "disk_usage_percent": 55.0,
+    "cpu_temp_celsius": 48.0,
+    "fan_speed_percent": 30.0,
+}
+
+@pytest.fixture(autouse=True)
+def fake_metrics(monkeypatch: pytest.MonkeyPatch):
+    """Returns a fixed sample instead of reading the host."""
+    monkeypatch.setattr(metrics_service, "get_system_metrics", lambda: dict(SAMPLE))
+
+async def _count(session: AsyncSession) -> int:
+    return (await session.execute(select(func.count(Metric.id)))).scalar_one()
+
+async def test_collect_buffers_until_batch_is_full(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession]
+):
+    """Samples are held in memory and written in one go once batch_size is reached."""
+    batch = MetricBatch(batch_size=3, flush_interval=3600)
+    async with test_session_factory() as session:
+        await collect_and_store_metrics(session, batch) # First sample is written immediately
+        assert await _count(session) == 1
+
+        for _ in range(2):
+            await collect_and_store_metrics(session, batch)
+        assert await _count(session) == 1
+        assert len(batch.rows) == 2
+
+        await collect_and_store_metrics(session, batch)
+
+        assert await _count(session) == 4
+        assert not batch.rows
+        stored = (await session.execute(select(Metric))).scalars().all()
+        assert all(m.cpu_percent == 12.5 and m.timestamp is not None for m in stored)
+
+async def test_collect_flushes_when_interval_elapsed(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession]
+):
+    """A partial batch is written once the flush interval has passed."""
+    batch = MetricBatch(batch_size=100, flush_interval=0)
+    async with test_session_factory() as session:
+        await collect_and_store_metrics(session, batch)
+        assert await _count(session) == 1
+
+async def test_flush_primes_latest_metric_cache(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """After a flush, the latest metric is served from memory with its database id."""
+    batch = MetricBatch(batch_size=1, flush_interval=3600)
+    async with test_session_factory() as session:
+        await collect_and_store_metrics(session, batch)
+        stored_id, stored_timestamp = (await session.execute(select(Metric.id, Metric.timestamp))).one()
+
+        monkeypatch.setattr(MetricRepository, "get_latest", lambda self: pytest.fail("latest metric should be cached"))
+        latest = await get_latest_cached(session, ttl=60)
+
+        assert latest.id == stored_id
+        assert latest.timestamp == stored_timestamp  # Same value and tz-awareness as a database read
+        assert latest.cpu_percent == 12.5
+
+def test_copy_records_match_insert_rows():
+    """The COPY path writes the same columns, in the declared order, as the INSERT path."""
+    sample = MetricSample(datetime.now(UTC), 1.0, 2.0, 3.0, None, 5.0)
+
+    row = sample.as_row()
+
+    assert tuple(row) == _COPY_COLUMNS
+    assert sample.as_record() == tuple(row.values())
+
+async def test_flush_interval_is_measured_from_flush_start(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """A slow commit doesn't delay the next flush when the interval matches the collection interval."""
+    now = [1000.0]
+    monkeypatch.setattr(metrics_collector, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    batch = MetricBatch(batch_size=100, flush_interval=60)
+    async with test_session_factory() as session:
+        real_commit = session.commit
+
+        async def slow_commit() -> None:
+            now[0] += 2  # The write takes longer than collecting the next sample will
+            await real_commit()
+
+        monkeypatch.setattr(session, "commit", slow_commit)
+        await collect_and_store_metrics(session, batch)
+
+        now[0] = 1059.99  # Next tick, with a little scheduling jitter
+        await collect_and_store_metrics(session, batch)
+
+        assert await _count(session) == 2
+
+class _FakeAsyncpgSession:
+    """Just enough of an AsyncSession on asyncpg for MetricBatch.flush's COPY branch."""
+
+    def __init__(self, copy_error: Exception | None = None):
+        self.copies: list[tuple[str, list[tuple], tuple[str, ...]]] = []
+        self.commits = 0
+        self.invalidated: list[BaseException | None] = []
+        self._copy_error = copy_error
+
+    async def connection(self):
+        session = self
+
+        class Connection:
+            dialect = SimpleNamespace(driver="asyncpg")
+
+            async def get_raw_connection(self):
+                return SimpleNamespace(driver_connection=SimpleNamespace(copy_records_to_table=session._copy))
+
+            async def invalidate(self, exception=None):
+                session.invalidated.append(exception)
+
+        return Connection()
+
+    async def _copy(self, table: str, *, records: list[tuple], columns: tuple[str, ...]) -> None:
+        if self._copy_error is not None:
+            raise self._copy_error
+        self.copies.append((table, records, columns))
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+async def test_flush_uses_copy_on_asyncpg(monkeypatch: pytest.MonkeyPatch):
+    """On asyncpg the buffer is written with copy_records_to_table and the latest cache is invalidated."""
+    invalidations = []
+    monkeypatch.setattr(metrics_collector, "invalidate_latest", lambda: invalidations.append(True))
+    session = _FakeAsyncpgSession()
+    batch = MetricBatch(batch_size=10, flush_interval=60)
+    samples = [MetricSample(datetime.now(UTC), 1.0, 2.0, 3.0, None, 5.0), MetricSample(datetime.now(UTC), 6.0, 7.0, 8.0, 9.0, None)]
+    for sample in samples:
+        batch.append(sample)
+
+    assert await batch.flush(session) == 2
+
+    assert session.copies == [("metrics", [s.as_record() for s in samples], _COPY_COLUMNS)]
+    assert session.commits == 1
+    assert invalidations == [True]
+    assert not batch.rows
+
+async def test_copy_connection_loss_raises_operational_error():
+    """A dropped asyncpg connection mid-COPY becomes an OperationalError so the task rebuilds its session."""
+    asyncpg = pytest.importorskip("asyncpg")
+    error = asyncpg.exceptions.ConnectionDoesNotExistError("connection was closed in the middle of operation")
+    session = _FakeAsyncpgSession(copy_error=error)
+    batch = MetricBatch(batch_size=10, flush_interval=60)
+    batch.append(MetricSample(datetime.now(UTC), 1.0, 2.0, 3.0, 4.0, 5.0))
+
+    with pytest.raises(OperationalError):
+        await batch.flush(session)
+
+    assert session.invalidated == [error]
+    assert len(batch.rows) == 1  # Kept for the retry on the new session
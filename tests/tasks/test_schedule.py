@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pytest
+
+from sat_x.tasks import schedule as schedule_module
+from sat_x.tasks.schedule import TickSchedule
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Fake monotonic clock; sleeping advances it instead of waiting."""
+    now = [100.0]
+
+    async def fake_sleep(delay: float) -> None:
+        now[0] += delay
+
+    # Replace the module references only, so the event loop keeps the real clock
+    monkeypatch.setattr(schedule_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(schedule_module, "asyncio", SimpleNamespace(sleep=fake_sleep))
+    return now
+
+async def test_sleep_subtracts_body_runtime(clock: list[float]):
+    """Ticks stay on the interval grid regardless of how long the body took."""
+    schedule = TickSchedule(10)
+
+    clock[0] += 3  # body runtime
+    await schedule.sleep()
+    assert clock[0] == 110
+
+    clock[0] += 7
+    await schedule.sleep()
+    assert clock[0] == 120
+
+async def test_overrun_skips_missed_ticks(clock: list[float]):
+    """A body that overruns waits for the next future tick instead of catching up."""
+    schedule = TickSchedule(10)
+
+    clock[0] += 25
+    await schedule.sleep()
+
+    assert clock[0] == 130
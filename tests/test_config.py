@@ -0,0 +1,93 @@
+import dataclasses
+from pathlib import Path
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
+from sat_x.config import CACHE_SUFFIX, FanControlSettings, RuntimeSettings, Settings
+
+SETTINGS_YAML = """
+api:
+  host: "127.0.0.1"
+  port: 8000
+database:
+  url: "sqlite+aiosqlite:///:memory:"
+tasks:
+  metrics:
+    enabled: true
+    interval_seconds: 60
+"""
+
+def _write_settings(tmp_path: Path, content: str = SETTINGS_YAML) -> Path:
+    path = tmp_path / "settings.yaml"
+    path.write_text(content)
+    return path
+
+def test_load_from_yaml_writes_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """First load validates the YAML; a second load is served from the cache without parsing."""
+    path = _write_settings(tmp_path)
+
+    loaded = Settings.load_from_yaml(path)
+
+    assert loaded.api.port == 8000
+    assert path.with_suffix(CACHE_SUFFIX).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit should skip YAML parsing and validation")
+
+    monkeypatch.setattr(yaml, "load", fail)
+    monkeypatch.setattr(Settings, "model_validate", fail)
+    assert Settings.load_from_yaml(path) == loaded
+
+def test_load_from_yaml_skips_cache_in_read_only_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]):
+    """An unwritable config directory silently skips writing the cache."""
+    path = _write_settings(tmp_path)
+    monkeypatch.setattr("sat_x.config.os.access", lambda *args: False)
+
+    assert Settings.load_from_yaml(path).api.port == 8000
+    assert not path.with_suffix(CACHE_SUFFIX).exists()
+    assert capsys.readouterr().out == ""
+
+def test_load_from_yaml_ignores_stale_cache(tmp_path: Path):
+    """Editing the YAML file invalidates the cached settings."""
+    path = _write_settings(tmp_path)
+    Settings.load_from_yaml(path)
+
+    path.write_text(SETTINGS_YAML.replace("port: 8000", "port: 18000"))
+
+    assert Settings.load_from_yaml(path).api.port == 18000
+
+def test_load_from_yaml_ignores_corrupt_cache(tmp_path: Path):
+    """A corrupt cache falls back to parsing the YAML file."""
+    path = _write_settings(tmp_path)
+    path.with_suffix(CACHE_SUFFIX).write_bytes(b"not a pickle")
+
+    assert Settings.load_from_yaml(path).api.port == 8000
+
+def test_runtime_settings_mirrors_settings(tmp_path: Path):
+    """RuntimeSettings is a frozen, hashable copy of the hot-path fields."""
+    loaded = Settings.load_from_yaml(_write_settings(tmp_path))
+
+    runtime = RuntimeSettings.from_settings(loaded)
+
+    assert runtime.metrics_interval == 60
+    assert runtime.db_url == loaded.database.url
+    assert hash(runtime) == hash(RuntimeSettings.from_settings(loaded))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        runtime.metrics_interval = 1  # type: ignore[misc]
+
+def test_fan_curve_must_be_sorted():
+    """Equal temperatures are allowed, decreasing ones are rejected."""
+    FanControlSettings(curve=[{"temp": 30, "speed": 10}, {"temp": 30, "speed": 20}, {"temp": 60, "speed": 50}])
+
+    with pytest.raises(ValidationError, match="sorted by temperature"):
+        FanControlSettings(curve=[{"temp": 60, "speed": 50}, {"temp": 30, "speed": 10}])
+
+def test_speed_for_is_exact_at_curve_points():
+    """Lookups are exact at and just below each curve temperature."""
+    curve = FanControlSettings(curve=[{"temp": 30, "speed": 30}, {"temp": 42.3, "speed": 55}])
+
+    assert curve.speed_for(42.29) == 30
+    assert curve.speed_for(42.3) == 55
+    assert curve.speed_for(-10) == 0.0
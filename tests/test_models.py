@@ -0,0 +1,26 @@
+from sqlalchemy import create_mock_engine
+from sqlalchemy.engine import make_url
+
+from sat_x.models import Metric
+
+
+def _create_ddl(url: str) -> str:
+    """Renders the CREATE statements for the metrics table on the dialect of `url`."""
+    statements: list[str] = []
+    engine = create_mock_engine(make_url(url), lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect))))
+    Metric.__table__.create(engine)
+    return "\n".join(statements)
+
+def test_postgres_gets_brin_timestamp_index():
+    """PostgreSQL uses a BRIN index on timestamp and skips the B-tree."""
+    ddl = _create_ddl("postgresql://")
+
+    assert "CREATE INDEX ix_metrics_ts_brin ON metrics USING brin (timestamp) WITH (pages_per_range = 128)" in ddl
+    assert "ix_metrics_timestamp_id" not in ddl
+
+def test_sqlite_gets_btree_timestamp_index():
+    """SQLite has no BRIN, so it keeps a (timestamp, id) B-tree."""
+    ddl = _create_ddl("sqlite://")
+
+    assert "CREATE INDEX ix_metrics_timestamp_id ON metrics (timestamp, id)" in ddl
+    assert "brin" not in ddl
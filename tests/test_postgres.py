@@ -0,0 +1,97 @@
+"""Integration tests against a real PostgreSQL server.
+
+Skipped unless SATX_TEST_POSTGRES_URL points at a throwaway database, e.g.
+postgresql+asyncpg://postgres@127.0.0.1:5432/postgres. The public schema is wiped.
+"""
+import datetime
+import os
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from sat_x.database import init_db
+from sat_x.services import partition_service
+from sat_x.tasks.metrics_collector import MetricBatch, MetricSample
+
+POSTGRES_URL = os.environ.get("SATX_TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="SATX_TEST_POSTGRES_URL is not set")
+
+@pytest_asyncio.fixture
+async def pg_engine() -> AsyncGenerator[AsyncEngine]:
+    """Engine on an empty public schema."""
+    pytest.importorskip("asyncpg")
+    engine = create_async_engine(POSTGRES_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    yield engine
+    await engine.dispose()
+
+async def _tables(engine: AsyncEngine) -> set[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT tablename FROM pg_tables WHERE schemaname = 'public'"))
+        return set(result.scalars())
+
+async def test_init_db_creates_partitions_and_indexes(pg_engine: AsyncEngine):
+    """A fresh database gets the partitioned table, today's partition and the BRIN index."""
+    await init_db(pg_engine)
+
+    async with pg_engine.connect() as conn:
+        assert await partition_service.is_partitioned(conn)
+        indexes = set((await conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'metrics'"))).scalars())
+    today = datetime.datetime.now(datetime.UTC).date()
+    assert {"metrics_default", partition_service.partition_name(today)} <= await _tables(pg_engine)
+    assert "ix_metrics_ts_brin" in indexes
+
+async def test_stranded_default_rows_are_moved_into_new_partition(pg_engine: AsyncEngine):
+    """A row that fell into metrics_default (e.g. clock jump) doesn't block creating its day's partition."""
+    await init_db(pg_engine)
+    today = datetime.datetime.now(datetime.UTC).date()
+    future = today + datetime.timedelta(days=10)  # Beyond premake_days, so it lands in the default
+    async with pg_engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO metrics (timestamp, cpu_percent) VALUES (:ts, 1.0)"),
+            {"ts": datetime.datetime.combine(future, datetime.time(12), tzinfo=datetime.UTC)},
+        )
+
+    async with pg_engine.begin() as conn:
+        await partition_service.ensure_partitions(conn, future, days_ahead=0)
+        expired = await partition_service.drop_expired_partitions(conn, future, retention_days=1)
+
+    assert partition_service.partition_name(today) in expired  # Retention still ran in the same transaction
+    async with pg_engine.connect() as conn:
+        assert (await conn.execute(text(f"SELECT count(*) FROM {partition_service.partition_name(future)}"))).scalar() == 1
+        assert (await conn.execute(text("SELECT count(*) FROM metrics_default"))).scalar() == 0
+    assert "metrics_default" in await _tables(pg_engine)
+
+async def test_failed_partition_does_not_abort_transaction(pg_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch):
+    """A partition that can't be created is skipped; later partitions and retention still run."""
+    await init_db(pg_engine)
+    future = datetime.datetime.now(datetime.UTC).date() + datetime.timedelta(days=10)
+
+    original = partition_service.create_partition_sql
+    monkeypatch.setattr(partition_service, "create_partition_sql", lambda day: "CREATE TABLE broken (" if day == future else original(day))
+    async with pg_engine.begin() as conn:
+        await partition_service.ensure_partitions(conn, future, days_ahead=1)
+        await partition_service.drop_expired_partitions(conn, future, retention_days=30)
+
+    tables = await _tables(pg_engine)
+    assert partition_service.partition_name(future) not in tables
+    assert partition_service.partition_name(future + datetime.timedelta(days=1)) in tables
+
+async def test_batch_flush_copies_into_partitions(pg_engine: AsyncEngine):
+    """The asyncpg COPY path writes buffered samples into the day partitions."""
+    await init_db(pg_engine)
+    batch = MetricBatch(batch_size=10, flush_interval=60)
+    batch.append(MetricSample(datetime.datetime.now(datetime.UTC), 1.0, 2.0, 3.0, 4.0, 5.0))
+
+    async with async_sessionmaker(pg_engine, expire_on_commit=False)() as session:
+        assert await batch.flush(session) == 1
+
+    today = datetime.datetime.now(datetime.UTC).date()
+    async with pg_engine.connect() as conn:
+        assert (await conn.execute(text(f"SELECT count(*) FROM {partition_service.partition_name(today)}"))).scalar() == 1
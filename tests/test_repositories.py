@@ -0,0 +1,19 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from sat_x.models import Metric
+from sat_x.repositories import MetricRepository
+
+
+async def test_add_returns_generated_fields_without_tracking(
+    setup_database,
+    test_session_factory: async_sessionmaker[AsyncSession]
+):
+    """add() fills id and the server-default timestamp from RETURNING, bypassing the unit of work."""
+    async with test_session_factory() as session:
+        metric = await MetricRepository(session).add(Metric(cpu_percent=42.0))
+        await session.commit()
+
+        assert metric.id is not None
+        assert metric.timestamp is not None
+        assert metric not in session
+        assert (await session.get(Metric, metric.id)).cpu_percent == 42.0